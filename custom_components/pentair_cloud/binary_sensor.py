@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -12,11 +13,12 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 import logging
 
-from .const import DOMAIN
+from .const import DOMAIN, SIGNAL_DEVICE_ADDED
 from .coordinator import PentairDataUpdateCoordinator, PentairDeviceDataUpdateCoordinator
 from .entity import PentairEntity
 from .helpers import get_field_value
@@ -37,6 +39,14 @@ class PentairBinarySensorEntityDescription(
     """Pentair binary sensor entity description."""
 
 
+@dataclass(frozen=True, kw_only=True)
+class PentairCoordinatorBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Pentair binary sensor entity description for values kept by the coordinator."""
+
+    is_on: Callable[[PentairDeviceDataUpdateCoordinator], Any]
+    exists_fn: Callable[[PentairDeviceDataUpdateCoordinator], bool] = lambda _: True
+
+
 SENSOR_MAP: dict[str | None, tuple[PentairBinarySensorEntityDescription, ...]] = {
     "IF31": (
         PentairBinarySensorEntityDescription(
@@ -51,46 +61,61 @@ SENSOR_MAP: dict[str | None, tuple[PentairBinarySensorEntityDescription, ...]] =
             device_class=BinarySensorDeviceClass.BATTERY,
             entity_category=EntityCategory.DIAGNOSTIC,
             translation_key="low_battery",
-            is_on=lambda data: int(data["fields"]["bvl"]) < 3
-            or data["fields"]["bft"] == "4",
+            is_on=lambda data: int(get_field_value("bvl", data)) < 3
+            or str(get_field_value("bft", data)) == "4",
         ),
         PentairBinarySensorEntityDescription(
             key="battery_charging",
             device_class=BinarySensorDeviceClass.BATTERY_CHARGING,
             entity_category=EntityCategory.DIAGNOSTIC,
-            is_on=lambda data: data["fields"]["bch"] != "2",
+            is_on=lambda data: str(get_field_value("bch", data)) != "2",
         ),
         PentairBinarySensorEntityDescription(
             key="online",
             device_class=BinarySensorDeviceClass.CONNECTIVITY,
             entity_category=EntityCategory.DIAGNOSTIC,
             translation_key="online",
-            is_on=lambda data: data["fields"]["online"],
+            is_on=lambda data: get_field_value("online", data),
         ),
         PentairBinarySensorEntityDescription(
             key="power",
             device_class=BinarySensorDeviceClass.POWER,
             entity_category=EntityCategory.DIAGNOSTIC,
             translation_key="power",
-            is_on=lambda data: data["fields"]["acp"] == "1",
+            is_on=lambda data: str(get_field_value("acp", data)) == "1",
         ),
         PentairBinarySensorEntityDescription(
             key="primary_pump",
             device_class=BinarySensorDeviceClass.PROBLEM,
             translation_key="primary_pump",
-            is_on=lambda data: data["fields"]["sts"] == "2",
+            is_on=lambda data: str(get_field_value("sts", data)) == "2",
         ),
         PentairBinarySensorEntityDescription(
             key="secondary_pump",
             device_class=BinarySensorDeviceClass.PROBLEM,
             translation_key="secondary_pump",
-            is_on=lambda data: int(data["fields"]["sts"]) > 0,
+            is_on=lambda data: int(get_field_value("sts", data)) > 0,
         ),
         PentairBinarySensorEntityDescription(
             key="water_level",
             device_class=BinarySensorDeviceClass.PROBLEM,
             translation_key="water_level",
-            is_on=lambda data: data["fields"]["sts"] == 5,
+            is_on=lambda data: str(get_field_value("sts", data)) == "5",
+        ),
+    ),
+}
+
+COORDINATOR_SENSOR_MAP: dict[
+    str, tuple[PentairCoordinatorBinarySensorEntityDescription, ...]
+] = {
+    "IF31": (
+        PentairCoordinatorBinarySensorEntityDescription(
+            key="filter_clogged",
+            device_class=BinarySensorDeviceClass.PROBLEM,
+            translation_key="filter_clogged",
+            is_on=lambda coordinator: coordinator.analytics
+            and coordinator.analytics.filter_clogged,
+            exists_fn=lambda coordinator: coordinator.history is not None,
         ),
     ),
 }
@@ -104,24 +129,57 @@ async def async_setup_entry(
     """Set up Pentair binary sensors using config entry."""
     coordinator: PentairDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]["pypentair_coordinator"]  
 
-    entities = [
+    @callback
+    def _async_add_device(device_coordinator: PentairDeviceDataUpdateCoordinator) -> None:
+        """Add the binary sensors of a device discovered after setup."""
+        if entities := _get_device_entities(device_coordinator, config_entry):
+            async_add_entities(entities)
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICE_ADDED.format(config_entry.entry_id), _async_add_device
+        )
+    )
+
+    entities: list[BinarySensorEntity] = []
+    for device_coordinator in coordinator.device_coordinators:
+        entities.extend(_get_device_entities(device_coordinator, config_entry))
+
+    if not entities:
+        return
+
+    async_add_entities(entities)
+
+
+def _get_device_entities(
+    device_coordinator: PentairDeviceDataUpdateCoordinator, config_entry: ConfigEntry
+) -> list[BinarySensorEntity]:
+    """Return the binary sensors of a device."""
+    if not (data := device_coordinator.get_device_data()):
+        return []
+
+    entities: list[BinarySensorEntity] = [
         PentairBinarySensorEntity(
-            #coordinator=coordinator.device_coordinators,
-            coordinator=coordinator,
+            coordinator=device_coordinator,
             config_entry=config_entry,
             description=description,
-            device_id=device["deviceId"],
+            device_id=device_coordinator.device_id,
         )
-        for device in coordinator.get_devices()
         for device_type, descriptions in SENSOR_MAP.items()
         for description in descriptions
-        if device_type is None or device["deviceType"] == device_type
+        if device_type is None or data.get("deviceType") == device_type
     ]
-
-    if not entities:
-        return
-
-    async_add_entities(entities)
+    entities.extend(
+        PentairCoordinatorBinarySensorEntity(
+            coordinator=device_coordinator,
+            config_entry=config_entry,
+            description=description,
+            device_id=device_coordinator.device_id,
+        )
+        for description in COORDINATOR_SENSOR_MAP.get(data.get("deviceType"), ())
+        if description.exists_fn(device_coordinator)
+    )
+    return entities
 
 #async def async_setup_entry(
 #    hass: HomeAssistant,
@@ -183,4 +241,20 @@ class PentairBinarySensorEntity(PentairEntity, BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        return self.entity_description.is_on(self.get_device())
+        return self.get_cached_value(
+            lambda: self.entity_description.is_on(self.get_device())
+        )
+
+
+class PentairCoordinatorBinarySensorEntity(PentairEntity, BinarySensorEntity):
+    """Pentair binary sensor entity for values kept by the coordinator."""
+
+    entity_description: PentairCoordinatorBinarySensorEntityDescription
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return true if the binary sensor is on."""
+        value = self.get_cached_value(
+            lambda: self.entity_description.is_on(self.coordinator)
+        )
+        return None if value is None else bool(value)
@@ -0,0 +1,105 @@
+"""Request and response codec of the Pentair cloud hub."""
+
+from __future__ import annotations
+
+from base64 import urlsafe_b64decode
+from typing import Any, TypedDict, cast
+
+import orjson
+
+SET_DEVICE_SUCCESS = "set_device_success"
+
+
+class DeviceSummary(TypedDict, total=False):
+    """Device of the user devices response."""
+
+    deviceId: str
+    deviceType: str
+    status: str
+    pname: str
+    productInfo: dict[str, Any]
+
+
+class DevicesResponse(TypedDict):
+    """Response of the user devices endpoint."""
+
+    data: list[DeviceSummary]
+
+
+class DeviceField(TypedDict, total=False):
+    """Field of a device status."""
+
+    value: str
+
+
+class DeviceStatus(TypedDict):
+    """Device of the device2 status response."""
+
+    deviceId: str
+    fields: dict[str, DeviceField]
+
+
+class DevicesStatusResponseBody(TypedDict):
+    """Body of the device2 status response."""
+
+    data: list[DeviceStatus]
+
+
+class DevicesStatusResponse(TypedDict, total=False):
+    """Response of the device2 status endpoint."""
+
+    response: DevicesStatusResponseBody
+    message: str
+
+
+class SetDeviceResponseBody(TypedDict):
+    """Body of the device service response."""
+
+    code: str
+
+
+class SetDeviceResponse(TypedDict):
+    """Response of the device service endpoint."""
+
+    data: SetDeviceResponseBody
+
+
+def encode_devices_status_request(device_ids: list[str]) -> bytes:
+    """Encode the body of a device2 status request."""
+    return orjson.dumps({"deviceIds": device_ids})
+
+
+def encode_device_payload(payload: dict[str, str]) -> bytes:
+    """Encode the body of a device service request."""
+    return orjson.dumps({"payload": payload})
+
+
+def encode_program_enable(program_id: int, value: int) -> bytes:
+    """Encode the request enabling (or disabling) a program."""
+    return encode_device_payload({f"zp{program_id}e10": str(value)})
+
+
+def encode_last_active_program(value: int) -> bytes:
+    """Encode the request setting the last active program."""
+    return encode_device_payload({"p2": str(value)})
+
+
+def decode_devices_response(content: bytes) -> DevicesResponse:
+    """Decode the response of the user devices endpoint."""
+    return cast(DevicesResponse, orjson.loads(content))
+
+
+def decode_devices_status_response(content: bytes) -> DevicesStatusResponse:
+    """Decode the response of the device2 status endpoint."""
+    return cast(DevicesStatusResponse, orjson.loads(content))
+
+
+def decode_set_device_response(content: bytes) -> SetDeviceResponse:
+    """Decode the response of the device service endpoint."""
+    return cast(SetDeviceResponse, orjson.loads(content))
+
+
+def decode_jwt_claims(token: str) -> dict[str, Any]:
+    """Decode the claims of a JWT, without verifying its signature."""
+    payload = token.split(".")[1]
+    return orjson.loads(urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
@@ -8,20 +8,32 @@ from typing import Any
 from pypentair import Pentair, PentairAuthenticationError
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError # Importez HomeAssistantError d'ici
-from .pentaircloud import PentairCloudHub
-
-from .const import DOMAIN
+from .executor import async_get_executor
+
+from .const import (
+    CONF_DEVICE_INTERVALS,
+    CONF_DEVICE_TYPE_INTERVALS,
+    CONF_LOOP_WATCHDOG,
+    CONF_MAX_DATA_AGE,
+    CONF_PROGRAM_LIGHTS,
+    CONF_TOKEN_REFRESH_MARGIN,
+    DEFAULT_MAX_DATA_AGE,
+    DEFAULT_TOKEN_REFRESH_MARGIN,
+    DEVICE_TYPE_INTERVALS,
+    DOMAIN,
+)
 
 
 _LOGGER = logging.getLogger(__name__)
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {vol.Required(CONF_USERNAME): str, vol.Required(CONF_PASSWORD): str}
 )
+INTERVAL_VALIDATOR = vol.All(vol.Coerce(int), vol.Range(min=10, max=86400))
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
@@ -32,12 +44,14 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     # If your PyPI package is not built with async, pass your methods
     # to the executor:
-    # await hass.async_add_executor_job(
+    # await async_get_executor(hass).async_run(
     #     your_validate_func, data["username"], data["password"]
     # )
 
+    from .pentaircloud import PentairCloudHub  # pylint: disable=import-outside-toplevel
+
     hub = PentairCloudHub(_LOGGER)
-    if not await hass.async_add_executor_job(
+    if not await async_get_executor(hass).async_run(
         #hub.authenticate, data["username"], data["password"]
         hub.authenticate, data[CONF_USERNAME], data[CONF_PASSWORD]
     ):
@@ -58,9 +72,17 @@ class PentairConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> PentairOptionsFlow:
+        """Get the options flow for this handler."""
+        return PentairOptionsFlow()
+
     async def _async_create_entry(self, user_input: dict[str, Any]) -> FlowResult:
         """Create the config entry."""
-        existing_entry = await self.async_set_unique_id(DOMAIN)
+        existing_entry = await self.async_set_unique_id(
+            user_input[CONF_USERNAME].lower()
+        )
 
         #config_data = {k: v for k, v in user_input.items() if k != CONF_PASSWORD}
         config_data = user_input
@@ -83,7 +105,7 @@ class PentairConfigFlow(ConfigFlow, domain=DOMAIN):
 
         pentair = Pentair(username=user_input[CONF_USERNAME])
         try:
-            await self.hass.async_add_executor_job(
+            await async_get_executor(self.hass).async_run(
                 pentair.authenticate, user_input[CONF_PASSWORD]
             )
         except PentairAuthenticationError:
@@ -104,9 +126,9 @@ class PentairConfigFlow(ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
-            for entry in self._async_current_entries():
-                if entry.data[CONF_USERNAME] == user_input[CONF_USERNAME]:
-                    return self.async_abort(reason="already_configured")
+            # One entry per account, several accounts can share devices
+            await self.async_set_unique_id(user_input[CONF_USERNAME].lower())
+            self._abort_if_unique_id_configured()
 
             return await self.async_pentair_login(
                 step_id="user", user_input=user_input, schema=STEP_USER_DATA_SCHEMA
@@ -180,6 +202,94 @@ class PentairConfigFlow(ConfigFlow, domain=DOMAIN):
 #            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
 #       )
 
+class PentairOptionsFlow(OptionsFlow):
+    """Handle the polling options of a Pentair account."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._options: dict[str, Any] = {}
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set the intervals per device type."""
+        if user_input is not None:
+            self._options = dict(self.config_entry.options) | user_input
+            if self._get_devices():
+                return await self.async_step_devices()
+            return self.async_create_entry(data=self._options)
+
+        options = self.config_entry.options
+        schema = {
+            vol.Required(
+                option, default=options.get(option, DEVICE_TYPE_INTERVALS[device_type])
+            ): INTERVAL_VALIDATOR
+            for device_type, option in CONF_DEVICE_TYPE_INTERVALS.items()
+        }
+        schema[
+            vol.Required(
+                CONF_TOKEN_REFRESH_MARGIN,
+                default=options.get(
+                    CONF_TOKEN_REFRESH_MARGIN, DEFAULT_TOKEN_REFRESH_MARGIN
+                ),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=3000))
+        schema[
+            vol.Required(
+                CONF_MAX_DATA_AGE,
+                default=options.get(CONF_MAX_DATA_AGE, DEFAULT_MAX_DATA_AGE),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=86400))
+        schema[
+            vol.Required(
+                CONF_LOOP_WATCHDOG, default=options.get(CONF_LOOP_WATCHDOG, False)
+            )
+        ] = bool
+        schema[
+            vol.Required(
+                CONF_PROGRAM_LIGHTS, default=options.get(CONF_PROGRAM_LIGHTS, True)
+            )
+        ] = bool
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
+
+    async def async_step_devices(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Override the interval of single devices, 0 uses the device type one."""
+        labels = {
+            f"{device['productInfo'].get('nickName', device['pname'])}"
+            f" ({device['deviceId'][-4:]})": device["deviceId"]
+            for device in self._get_devices()
+        }
+        if user_input is not None:
+            self._options[CONF_DEVICE_INTERVALS] = {
+                labels[label]: interval
+                for label, interval in user_input.items()
+                if interval and label in labels
+            }
+            return self.async_create_entry(data=self._options)
+
+        device_intervals = self.config_entry.options.get(CONF_DEVICE_INTERVALS, {})
+        return self.async_show_form(
+            step_id="devices",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        label, default=device_intervals.get(device_id, 0)
+                    ): vol.Any(0, INTERVAL_VALIDATOR)
+                    for label, device_id in labels.items()
+                }
+            ),
+        )
+
+    def _get_devices(self) -> list[dict[str, Any]]:
+        """Return the devices of the account, if the entry is loaded."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id, {})
+        if coordinator := entry_data.get("pypentair_coordinator"):
+            return coordinator.get_devices()
+        return []
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -4,7 +4,37 @@ from __future__ import annotations
 from typing import Final
 
 DOMAIN: Final = "pentair_cloud"
-DEBUG_INFO = True
 
 CONF_ID_TOKEN: Final = "id_token"
 CONF_REFRESH_TOKEN: Final = "refresh_token"
+
+SIGNAL_DEVICE_ADDED: Final = f"{DOMAIN}_device_added_{{}}"
+SIGNAL_HUB_DEVICES_UPDATED: Final = f"{DOMAIN}_hub_devices_updated_{{}}"
+
+CONF_TOKEN_REFRESH_MARGIN: Final = "token_refresh_margin"
+CONF_DEVICE_INTERVALS: Final = "device_intervals"
+CONF_MAX_DATA_AGE: Final = "max_data_age"
+CONF_LOOP_WATCHDOG: Final = "loop_watchdog"
+CONF_PROGRAM_LIGHTS: Final = "program_lights"
+CONF_DEVICE_TYPE_INTERVALS: Final = {
+    "IF31": "interval_if31",
+    "PPA0": "interval_ppa0",
+    "SSS1": "interval_sss1",
+}
+
+DEFAULT_TOKEN_REFRESH_MARGIN: Final = 300  # seconds before expiry
+TOKEN_REFRESH_INTERVAL: Final = 60  # seconds between two expiry checks
+DEFAULT_MAX_DATA_AGE: Final = 900  # seconds stale data is kept after failures
+
+ATTR_DATA_AGE: Final = "data_age"
+
+# Default polling interval per device type, in seconds
+DEVICE_TYPE_INTERVALS: Final = {
+    "IF31": 30,  # Variable speed pump
+    "PPA0": 900,  # Sump pump monitor
+    "SSS1": 1800,  # Salt level sensor
+}
+
+REQUEST_TIMEOUT: Final = (10, 30)  # seconds, connect and read timeouts of HTTP calls
+
+PROGRAM_COMMAND_CONCURRENCY: Final = 4  # concurrent program commands per account
@@ -2,40 +2,67 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+from collections.abc import Callable
+from datetime import datetime, timedelta
 import logging
+import time
 from typing import Any
 
-from deepdiff import DeepDiff
 from pypentair import Pentair
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_point_in_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .analytics import PumpAnalytics, compute_pump_analytics
 from .const import DOMAIN
+from .energy import PentairEnergyStorage, get_max_integration_gap
+from .executor import async_get_executor
+from .helpers import convert_timestamp, get_field_value
+from .history import HISTORY_FIELDS, TelemetryHistory
+from .registry import PentairHubRegistry
+from .schedule import PentairScheduleIndex
+from .singleflight import AsyncSingleFlight
+from .trace import ApiTrace
+from .watchdog import PentairLoopWatchdog
 
 _LOGGER = logging.getLogger(__name__)
 UPDATE_INTERVAL = 30
+DEVICE_LIST_UPDATE_INTERVAL = 3600  # The account device list rarely changes
+SCHEDULE_RELAXED_INTERVAL = 120  # Between known schedule transitions
+TRANSITION_REFRESH_DELAY = 15  # Delay of the refresh following a transition
+MAX_BACKOFF_INTERVAL = 600  # Longest polling interval after failed refreshes
 
 
 class PentairDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     def __init__(
-        self, hass: HomeAssistant, config_entry: ConfigEntry, client: Pentair
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        client: Pentair,
+        trace: ApiTrace | None = None,
     ) -> None:
         """Initialize."""
         self.api = client
+        self.trace = trace if trace is not None else ApiTrace()
+        self._flights = AsyncSingleFlight()
+        self.executor = async_get_executor(hass)
         self.devices: dict[str, list[dict[str, Any]]] = {}
         self.device_coordinators: list[PentairDeviceDataUpdateCoordinator] = []
+        self.added_device_ids: set[str] = set()
+        self.removed_device_ids: set[str] = set()
+        self.reactivated_device_ids: set[str] = set()
 
         super().__init__(
             hass,
             _LOGGER,
             config_entry=config_entry,
             name=DOMAIN,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            update_interval=timedelta(seconds=DEVICE_LIST_UPDATE_INTERVAL),
         )
 
     def get_device(self, device_id: str) -> dict | None:
@@ -57,20 +84,54 @@ class PentairDataUpdateCoordinator(DataUpdateCoordinator):
             if device_type is None or device["deviceType"] == device_type
         ]
 
+    async def _async_fetch_devices(self) -> Any:
+        """Fetch the account device list, shared by concurrent refreshes."""
+        with self.trace.call("get_devices"):
+            return await self.executor.async_run(self.api.get_devices)
+
     async def _async_update_data(self):
         """Update data via library, refresh token if necessary."""
+        self.added_device_ids = set()
+        self.removed_device_ids = set()
+        self.reactivated_device_ids = set()
         try:
-            if devices := await self.hass.async_add_executor_job(self.api.get_devices):
-                diff = DeepDiff(
-                    self.devices,
-                    devices,
-                    ignore_order=True,
-                    report_repetition=True,
-                    verbose_level=2,
-                )
-                _LOGGER.debug("Devices updated: %s", diff if diff else "no changes")
+            devices = await self._flights.do("get_devices", self._async_fetch_devices)
+            if devices:
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    from deepdiff import DeepDiff  # pylint: disable=import-outside-toplevel
+
+                    diff = DeepDiff(
+                        self.devices,
+                        devices,
+                        ignore_order=True,
+                        report_repetition=True,
+                        verbose_level=2,
+                    )
+                    _LOGGER.debug(
+                        "Devices updated: %s", diff if diff else "no changes"
+                    )
+                previous = {
+                    device["deviceId"]: device.get("status")
+                    for device in self.get_devices()
+                }
                 self.devices = devices
+                current = {
+                    device["deviceId"]: device.get("status")
+                    for device in self.get_devices()
+                }
+                if self.data is not None:
+                    self.added_device_ids = current.keys() - previous.keys()
+                    self.removed_device_ids = previous.keys() - current.keys()
+                    self.reactivated_device_ids = {
+                        device_id
+                        for device_id, status in current.items()
+                        if status == "ACTIVE"
+                        and previous.get(device_id, "ACTIVE") != "ACTIVE"
+                    }
         except Exception as err:  # pylint: disable=broad-except
+            if self.data is not None:  # Keep the known devices until the next try
+                _LOGGER.warning("Failed to update the Pentair device list: %s", err)
+                return self.devices
             _LOGGER.error(
                 "Unknown exception while updating Pentair data: %s", err, exc_info=1
             )
@@ -86,44 +147,292 @@ class PentairDeviceDataUpdateCoordinator(DataUpdateCoordinator):
         config_entry: ConfigEntry,
         client: Pentair,
         device_id: str,
+        energy_storage: PentairEnergyStorage | None = None,
+        registry: PentairHubRegistry | None = None,
+        trace: ApiTrace | None = None,
+        poll_interval: int = UPDATE_INTERVAL,
+        max_data_age: int = 0,
     ) -> None:
-        """Initialize."""
+        """Initialize.
+
+        The coordinator has no timer of its own, the poll loop of the config
+        entry refreshes it every poll_interval seconds. After a failed refresh
+        the last data is served (the coordinator stays successful) until it is
+        older than max_data_age seconds, while the polling backs off.
+        """
         self.api = client
+        self.trace = trace if trace is not None else ApiTrace()
+        self._flights = AsyncSingleFlight()
+        self.executor = async_get_executor(hass)
         self.device_id = device_id
+        self.energy_storage = energy_storage
+        self.registry = registry
+        self.follower = False
+        self.base_poll_interval = poll_interval
+        self.poll_interval = poll_interval
+        self.last_poll: float | None = None
+        self.max_data_age = max_data_age
+        self.last_success: float | None = None
+        self.consecutive_failures = 0
+        self.watchdog: PentairLoopWatchdog | None = None
+        self.skipped_refreshes = 0
+        self.generation = 0
+        self.history: TelemetryHistory | None = None
+        self.analytics: PumpAnalytics | None = None
+        self.schedule: PentairScheduleIndex | None = None
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        self._unsub_transition_refresh: CALLBACK_TYPE | None = None
 
         super().__init__(
             hass,
             _LOGGER,
             config_entry=config_entry,
             name=DOMAIN,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            update_interval=None,
+            always_update=False,
         )
 
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, timed by the loop watchdog if enabled."""
+        if self.watchdog is not None:
+            owner = getattr(update_callback, "__self__", None)
+            update_callback = self.watchdog.wrap(
+                getattr(owner, "entity_id", None)
+                or getattr(update_callback, "__qualname__", repr(update_callback)),
+                update_callback,
+            )
+        return super().async_add_listener(update_callback, context)
+
+    @callback
+    def async_set_follower(self, follower: bool) -> None:
+        """Set whether the device is polled by another config entry."""
+        self.follower = follower
+
+    @callback
+    def _async_set_poll_interval(self, seconds: int) -> None:
+        """Set the background polling interval of the device."""
+        self.poll_interval = seconds
+
+    @property
+    def effective_poll_interval(self) -> float:
+        """Return the polling interval, backed off after failed refreshes."""
+        if not self.consecutive_failures:
+            return self.poll_interval
+        return min(
+            self.poll_interval * 2 ** min(self.consecutive_failures, 10),
+            max(self.poll_interval, MAX_BACKOFF_INTERVAL),
+        )
+
+    @property
+    def data_age(self) -> float | None:
+        """Return the seconds elapsed since the data was last fetched."""
+        if self.last_success is None:
+            return None
+        return time.time() - self.last_success
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the data is kept from before failed refreshes."""
+        return self.consecutive_failures > 0
+
+    def poll_due(self, now: float) -> bool:
+        """Return True if the poll loop should refresh the device (monotonic time)."""
+        return not self.follower and (
+            self.last_poll is None
+            or now - self.last_poll >= self.effective_poll_interval
+        )
+
+    @callback
+    def async_set_polled_data(self, device: Any) -> None:
+        """Set a snapshot polled by the config entry polling the device."""
+        self.last_success = time.time()
+        self._process_device(device)
+        self.async_set_updated_data(device)
+
     def get_device_data(self) -> dict | None:
         """Get the device data."""
         if self.data and (data := self.data.get("data")):
             return data
         return None
 
+    def _process_telemetry(self, data: dict) -> None:
+        """Feed the pump telemetry to the energy accumulator and history."""
+        if data.get("deviceType") != "IF31" or not data.get("delivered"):
+            return
+        timestamp = convert_timestamp(data["delivered"]).timestamp()
+        values = {}
+        for field in HISTORY_FIELDS:
+            value = get_field_value(field, data)
+            values[field] = value if isinstance(value, (int, float)) else None
+
+        if self.energy_storage is not None and values["s18"] is not None:
+            self.energy_storage.async_add_power_sample(
+                self.device_id,
+                timestamp,
+                values["s18"],
+                get_max_integration_gap(self.poll_interval),
+            )
+        if self.history is None:
+            self.history = TelemetryHistory()
+        self.history.append(timestamp, values)
+
+    def _is_unchanged(self, device: Any) -> bool:
+        """Return True if the device has not reported since the last refresh."""
+        if not self.data or not (data := device.get("data")):
+            return False
+        delivered = data.get("delivered")
+        return delivered is not None and delivered == (
+            self.get_device_data() or {}
+        ).get("delivered")
+
+    def _process_device(self, device: Any) -> None:
+        """Process a freshly polled device snapshot."""
+        self.generation += 1
+        if data := device.get("data"):
+            self._process_telemetry(data)
+            self._process_schedule(data)
+
+    def _process_schedule(self, data: dict) -> None:
+        """Rebuild the schedule index when the program table changed."""
+        if data.get("deviceType") != "IF31":
+            return
+        if self.schedule is None:
+            self.schedule = PentairScheduleIndex()
+        if self.schedule.update(data.get("fields", {})):
+            _LOGGER.debug(
+                "Schedule of %s rebuilt: %s", self.device_id, self.schedule.programs
+            )
+            self._async_track_next_transition()
+
+    @callback
+    def _async_track_next_transition(self) -> None:
+        """Notify the listeners at the next schedule transition.
+
+        While the schedule predicts the transitions, background polling is
+        relaxed and a targeted refresh follows every transition instead.
+        """
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+        if self.schedule is None or not (
+            transition := self.schedule.next_transition(dt_util.now())
+        ):
+            self._async_set_poll_interval(self.base_poll_interval)
+            return
+        self._async_set_poll_interval(
+            max(self.base_poll_interval, SCHEDULE_RELAXED_INTERVAL)
+        )
+        self._unsub_transition = async_track_point_in_time(
+            self.hass, self._async_handle_transition, transition
+        )
+
+    @callback
+    def _async_handle_transition(self, now: datetime) -> None:
+        """Handle a schedule transition."""
+        self._unsub_transition = None
+        self.generation += 1
+        self.async_update_listeners()
+        self._async_track_next_transition()
+        if self._unsub_transition_refresh is None:
+            self._unsub_transition_refresh = async_call_later(
+                self.hass,
+                TRANSITION_REFRESH_DELAY,
+                self._async_refresh_after_transition,
+            )
+
+    async def _async_refresh_after_transition(self, now: datetime) -> None:
+        """Refresh the device once it has applied a schedule transition."""
+        self._unsub_transition_refresh = None
+        if not self.follower:
+            await self.async_request_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the schedule transition tracking."""
+        await super().async_shutdown()
+        for unsub in (self._unsub_transition, self._unsub_transition_refresh):
+            if unsub is not None:
+                unsub()
+        self._unsub_transition = self._unsub_transition_refresh = None
+
+    @callback
+    def async_update_analytics(self) -> None:
+        """Recompute the pump analytics from the telemetry history."""
+        if self.history is None or not len(self.history):
+            return
+        self.analytics = compute_pump_analytics(
+            self.history, get_max_integration_gap(self.poll_interval)
+        )
+        self.generation += 1
+        _LOGGER.debug(
+            "Pump analytics for %s computed in %.0f us: %s",
+            self.device_id,
+            self.analytics.duration_us,
+            self.analytics,
+        )
+        self.async_update_listeners()
+
+    async def _async_fetch_device(self) -> Any:
+        """Fetch the device, shared by concurrent refreshes."""
+        with self.trace.call("get_device", self.device_id):
+            return await self.executor.async_run(
+                self.api.get_device, self.device_id
+            )
+
     async def _async_update_data(self):
         """Update data via library, refresh token if necessary."""
+        self.last_poll = time.monotonic()
         try:
-            if device := await self.hass.async_add_executor_job(
-                self.api.get_device, self.device_id
-            ):
-                diff = DeepDiff(
-                    self.data,
-                    device,
-                    ignore_order=True,
-                    report_repetition=True,
-                    verbose_level=2,
-                )
-                _LOGGER.debug("Devices updated: %s", diff if diff else "no changes")
+            device = await self._flights.do("get_device", self._async_fetch_device)
+            if device:
+                self.last_success = time.time()
+                recovered = self.stale
+                self.consecutive_failures = 0
+                if self._is_unchanged(device):
+                    self.skipped_refreshes += 1
+                    if recovered:  # Drop the data age attribute
+                        self.async_update_listeners()
+                        # The other entries may have been marked failed
+                        if self.registry is not None:
+                            self.registry.async_fan_out(self, device)
+                    return self.data
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    from deepdiff import DeepDiff  # pylint: disable=import-outside-toplevel
+
+                    diff = DeepDiff(
+                        self.data,
+                        device,
+                        ignore_order=True,
+                        report_repetition=True,
+                        verbose_level=2,
+                    )
+                    _LOGGER.debug(
+                        "Devices updated: %s", diff if diff else "no changes"
+                    )
+                self._process_device(device)
+                if self.registry is not None:
+                    self.registry.async_fan_out(self, device)
                 return device
         except Exception as err:  # pylint: disable=broad-except
+            self.consecutive_failures += 1
+            if self.data is not None and (self.data_age or 0) <= self.max_data_age:
+                log = _LOGGER.warning if self.consecutive_failures == 1 else _LOGGER.debug
+                log(
+                    "Failed to update Pentair device %s, keeping data from %.0f s ago: %s",
+                    self.device_id,
+                    self.data_age or 0,
+                    err,
+                )
+                if self.consecutive_failures == 1:  # Show the data age attribute
+                    self.async_update_listeners()
+                return self.data
             _LOGGER.error(
                 "Unknown exception while updating Pentair data: %s", err, exc_info=1
             )
+            if self.registry is not None:
+                self.registry.async_fan_out_failure(self, err)
             raise UpdateFailed(err) from err
         else:
             return None
\ No newline at end of file
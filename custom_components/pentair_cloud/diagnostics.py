@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import Any
 
 from homeassistant.components.diagnostics.util import async_redact_data
@@ -10,6 +11,9 @@ from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN
 from .coordinator import PentairDataUpdateCoordinator
+from .executor import async_get_executor
+from .registry import async_get_hub_registry
+from .trace import ApiTrace
 
 TO_REDACT = {"arn", "deviceId", "email", "userId"}
 
@@ -19,11 +23,63 @@ async def async_get_config_entry_diagnostics(
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
     coordinator: PentairDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["pypentair_coordinator"]  
+    trace: ApiTrace = hass.data[DOMAIN][entry.entry_id]["api_trace"]
     diagnostics_data = {
         "get_devices": coordinator.data,
         "get_device": {
             "***" + device_coordinator.device_id[-4:]: device_coordinator.data
             for device_coordinator in coordinator.device_coordinators
         },
+        "analytics": {
+            "***" + device_coordinator.device_id[-4:]: asdict(
+                device_coordinator.analytics
+            )
+            for device_coordinator in coordinator.device_coordinators
+            if device_coordinator.analytics is not None
+        },
+        "skipped_refreshes": {
+            "***" + device_coordinator.device_id[-4:]: (
+                device_coordinator.skipped_refreshes
+            )
+            for device_coordinator in coordinator.device_coordinators
+        },
+        "poll_intervals": {
+            "***" + device_coordinator.device_id[-4:]: (
+                device_coordinator.poll_interval
+            )
+            for device_coordinator in coordinator.device_coordinators
+        },
+        "shared_devices": [
+            "***" + device_id[-4:]
+            for device_id in async_get_hub_registry(hass).shared_devices
+        ],
+        "cloud_device_errors": {
+            "***" + device.pentair_device_id[-4:]: {
+                "error_count": device.error_count,
+                "last_error": device.last_error,
+            }
+            for device in hub.get_devices()
+        }
+        if (hub := hass.data[DOMAIN][entry.entry_id].get("pentair_cloud_hub"))
+        else {},
+        "cloud_auth": {
+            "method": hub.auth_method,
+            "duration_ms": hub.auth_duration_ms,
+        }
+        if (hub := hass.data[DOMAIN][entry.entry_id].get("pentair_cloud_hub"))
+        else None,
+        "executor": async_get_executor(hass).as_dict(),
+        "loop_watchdog": watchdog.as_dict()
+        if (watchdog := hass.data[DOMAIN][entry.entry_id].get("loop_watchdog"))
+        else None,
+        "api_trace": [
+            event
+            | {
+                "device_id": "***" + event["device_id"][-4:]
+                if event["device_id"]
+                else None
+            }
+            for event in trace.as_list()
+        ],
     }
     return async_redact_data(diagnostics_data, TO_REDACT)
@@ -0,0 +1,124 @@
+"""Energy accumulation for Pentair pumps."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60  # seconds
+MAX_INTEGRATION_GAP = 900  # seconds, longer gaps are not integrated
+INTEGRATION_GAP_POLLS = 3  # poll intervals a gap can span and be integrated
+
+
+def get_max_integration_gap(poll_interval: float) -> float:
+    """Return the longest gap integrated for a poll interval (s).
+
+    The backoff after failed refreshes stretches the polling up to the
+    larger of the poll interval and 600 s, both stay within the limit.
+    """
+    return max(MAX_INTEGRATION_GAP, INTEGRATION_GAP_POLLS * poll_interval)
+
+
+@dataclass
+class PentairEnergyAccumulator:
+    """Trapezoidal energy accumulator fed with power samples."""
+
+    energy_wh: float = 0.0
+    last_timestamp: float | None = None
+    last_power: float | None = None
+
+    @property
+    def energy_kwh(self) -> float:
+        """Return the accumulated energy in kWh."""
+        return self.energy_wh / 1000
+
+    def add_sample(
+        self, timestamp: float, power: float, max_gap: float = MAX_INTEGRATION_GAP
+    ) -> bool:
+        """Integrate a power sample (W) reported at timestamp (s).
+
+        The interval between two reports is integrated as a trapezoid, so a
+        missed poll only widens the interval. Samples that are not newer than
+        the previous one are ignored, and gaps longer than max_gap restart
+        the integration instead of guessing what the pump did while it was
+        not reporting.
+        """
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+
+        changed = False
+        if self.last_timestamp is not None and self.last_power is not None:
+            elapsed = timestamp - self.last_timestamp
+            if elapsed <= max_gap:
+                self.energy_wh += (self.last_power + power) / 2 * elapsed / 3600
+                changed = True
+            else:
+                _LOGGER.debug(
+                    "Skipping %.0f s gap in power samples, restarting integration",
+                    elapsed,
+                )
+
+        self.last_timestamp = timestamp
+        self.last_power = power
+        return changed
+
+
+class PentairEnergyStorage:
+    """Persist the energy accumulators of a config entry."""
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}.energy"
+        )
+        self._accumulators: dict[str, PentairEnergyAccumulator] = {}
+
+    async def async_load(self) -> None:
+        """Load the accumulators from storage."""
+        if data := await self._store.async_load():
+            self._accumulators = {
+                device_id: PentairEnergyAccumulator(**values)
+                for device_id, values in data.items()
+            }
+
+    async def async_save(self) -> None:
+        """Save the accumulators now, replacing the pending delayed save."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the persisted accumulators."""
+        await self._store.async_remove()
+
+    def get_accumulator(self, device_id: str) -> PentairEnergyAccumulator:
+        """Get (or create) the accumulator of a device."""
+        return self._accumulators.setdefault(device_id, PentairEnergyAccumulator())
+
+    @callback
+    def async_add_power_sample(
+        self,
+        device_id: str,
+        timestamp: float,
+        power: float,
+        max_gap: float = MAX_INTEGRATION_GAP,
+    ) -> None:
+        """Integrate a power sample and schedule a save."""
+        if self.get_accumulator(device_id).add_sample(timestamp, power, max_gap):
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to persist."""
+        return {
+            device_id: asdict(accumulator)
+            for device_id, accumulator in self._accumulators.items()
+        }
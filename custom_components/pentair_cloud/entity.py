@@ -1,13 +1,14 @@
 """Pentair entities."""
 from __future__ import annotations
 
+from collections.abc import Callable
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo, EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import ATTR_DATA_AGE, DOMAIN
 from .coordinator import PentairDeviceDataUpdateCoordinator
 
 
@@ -29,6 +30,8 @@ class PentairEntity(CoordinatorEntity[PentairDeviceDataUpdateCoordinator]):
         self.entity_description = description
         self._device_id = device_id
         self._attr_unique_id = f"{device_id}-{description.key}"
+        self._cached_generation: int | None = None
+        self._cached_value: Any = None
 
         device = self.get_device()
         info = device["productInfo"]
@@ -41,6 +44,25 @@ class PentairEntity(CoordinatorEntity[PentairDeviceDataUpdateCoordinator]):
             sw_version=device.get("fwVersion"),
         )
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the age of the data while it is kept after failed refreshes."""
+        if self.coordinator.stale and (data_age := self.coordinator.data_age):
+            return {ATTR_DATA_AGE: round(data_age)}
+        return None
+
     def get_device(self) -> Any | None:
         """Get the device from the coordinator."""
         return self.coordinator.get_device_data()
+
+    def get_cached_value(self, value_fn: Callable[[], Any]) -> Any:
+        """Return the entity value, computed once per coordinator generation.
+
+        Home Assistant reads the state properties many times per update
+        (state writes, attributes, templates), the value is only recomputed
+        when the coordinator has processed new data since the last read.
+        """
+        if self._cached_generation != self.coordinator.generation:
+            self._cached_value = value_fn()
+            self._cached_generation = self.coordinator.generation
+        return self._cached_value
@@ -0,0 +1,117 @@
+"""Dedicated worker pool for the blocking Pentair calls."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+from typing import Any, TypeVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+_T = TypeVar("_T")
+
+DATA_EXECUTOR = "executor"
+EXECUTOR_WORKERS = 4
+CALL_TIMEOUT = 60  # seconds, deadline of a blocking call
+
+
+@callback
+def async_get_executor(hass: HomeAssistant) -> PentairExecutor:
+    """Get (or create) the worker pool of the domain."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (executor := domain_data.get(DATA_EXECUTOR)) is None:
+        executor = domain_data[DATA_EXECUTOR] = PentairExecutor()
+
+        @callback
+        def _async_shutdown(event: Event) -> None:
+            executor.shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+    return executor
+
+
+class PentairExecutor:
+    """Bounded pool running the blocking calls of the integration.
+
+    The pypentair, pycognito, AWS and HTTP calls run here instead of the
+    shared executor of Home Assistant, so a slow Pentair cloud can only
+    hold EXECUTOR_WORKERS threads. Every call has a deadline; a call past
+    its deadline keeps its worker until the HTTP timeouts release it.
+    """
+
+    def __init__(self, workers: int = EXECUTOR_WORKERS) -> None:
+        """Initialize."""
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=DOMAIN
+        )
+        self._lock = threading.Lock()
+        self.pending = 0  # Submitted and not finished, queued or running
+        self.running = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.timeouts = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of calls waiting for a worker."""
+        return max(self.pending - self.running, 0)
+
+    def _run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a call in a worker, keeping the counters."""
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def async_run(
+        self,
+        func: Callable[..., _T],
+        *args: Any,
+        timeout: float = CALL_TIMEOUT,
+    ) -> _T:
+        """Run a blocking call in the pool, raise TimeoutError past the deadline."""
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._run, func, *args
+        )
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            _LOGGER.warning(
+                "Pentair call %s did not complete within %s s",
+                getattr(func, "__qualname__", func),
+                timeout,
+            )
+            raise
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the metrics of the pool."""
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the pool without waiting for the running calls."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
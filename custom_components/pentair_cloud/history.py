@@ -0,0 +1,164 @@
+"""Bounded telemetry history for Pentair pumps."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable, Mapping
+from math import isnan, nan
+
+HISTORY_FIELDS: tuple[str, ...] = ("s17", "s18", "s19", "s26")
+HISTORY_WINDOWS: tuple[int, ...] = (3600, 86400)  # seconds
+HISTORY_CAPACITY = 2880  # 24 h of samples at a 30 s update interval
+
+
+class RollingWindow:
+    """Rolling mean, min and max of one history column over a time window.
+
+    The window only keeps the running sum and two monotonic deques of
+    absolute sample indexes, the samples themselves stay in the history
+    arrays. Every sample enters and leaves each deque once, so updates are
+    amortized O(1) and reads are O(1).
+    """
+
+    def __init__(self, history: TelemetryHistory, field: str, duration: int) -> None:
+        """Initialize."""
+        self._history = history
+        self._values = history.column(field)
+        self.field = field
+        self.duration = duration
+        self._start = 0
+        self._sum = 0.0
+        self._count = 0
+        self._min: deque[int] = deque()
+        self._max: deque[int] = deque()
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        return self._sum / self._count if self._count else None
+
+    @property
+    def min(self) -> float | None:
+        """Return the minimum of the window."""
+        return self._history.value(self._values, self._min[0]) if self._min else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the maximum of the window."""
+        return self._history.value(self._values, self._max[0]) if self._max else None
+
+    def push(self, index: int) -> None:
+        """Add the sample at index to the window."""
+        value = self._history.value(self._values, index)
+        if isnan(value):
+            return
+        self._sum += value
+        self._count += 1
+        while self._min and self._history.value(self._values, self._min[-1]) >= value:
+            self._min.pop()
+        self._min.append(index)
+        while self._max and self._history.value(self._values, self._max[-1]) <= value:
+            self._max.pop()
+        self._max.append(index)
+
+    def evict(self, oldest_index: int, oldest_timestamp: float) -> None:
+        """Drop the samples before oldest_index or older than oldest_timestamp."""
+        history = self._history
+        while self._start < history.end and (
+            self._start < oldest_index
+            or history.timestamp(self._start) < oldest_timestamp
+        ):
+            value = history.value(self._values, self._start)
+            if not isnan(value):
+                self._sum -= value
+                self._count -= 1
+            if self._min and self._min[0] == self._start:
+                self._min.popleft()
+            if self._max and self._max[0] == self._start:
+                self._max.popleft()
+            self._start += 1
+        if not self._count:
+            self._sum = 0.0
+
+
+class TelemetryHistory:
+    """Fixed-size, array-backed ring buffer of pump telemetry.
+
+    Samples are stored as C doubles in one array per field plus one for the
+    timestamps, so the sample storage never exceeds
+    (len(fields) + 1) * capacity * 8 bytes (115,200 bytes per device with
+    the defaults). Each rolling window adds two deques holding at most
+    capacity indexes.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str] = HISTORY_FIELDS,
+        windows: Iterable[int] = HISTORY_WINDOWS,
+        capacity: int = HISTORY_CAPACITY,
+    ) -> None:
+        """Initialize."""
+        self.capacity = capacity
+        self.end = 0  # absolute index of the next sample
+        self._timestamps = array("d", [nan]) * capacity
+        self._columns = {field: array("d", [nan]) * capacity for field in fields}
+        self.windows = {
+            (field, duration): RollingWindow(self, field, duration)
+            for field in self._columns
+            for duration in windows
+        }
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return min(self.end, self.capacity)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Return the size of the sample storage in bytes."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self._timestamps, *self._columns.values())
+        )
+
+    def column(self, field: str) -> array:
+        """Return the raw storage of a field."""
+        return self._columns[field]
+
+    def timestamp(self, index: int) -> float:
+        """Return the timestamp of the sample at an absolute index."""
+        return self._timestamps[index % self.capacity]
+
+    def value(self, column: array, index: int) -> float:
+        """Return the value of a column at an absolute index."""
+        return column[index % self.capacity]
+
+    def append(self, timestamp: float, values: Mapping[str, float | None]) -> bool:
+        """Append a sample, return False when it is not newer than the last one."""
+        if self.end and timestamp <= self.timestamp(self.end - 1):
+            return False
+
+        index = self.end
+        # The slot about to be overwritten must leave every window first
+        for window in self.windows.values():
+            window.evict(index - self.capacity + 1, -float("inf"))
+
+        position = index % self.capacity
+        self._timestamps[position] = timestamp
+        for field, column in self._columns.items():
+            value = values.get(field)
+            column[position] = nan if value is None else float(value)
+        self.end += 1
+
+        for window in self.windows.values():
+            window.push(index)
+            window.evict(0, timestamp - window.duration)
+        return True
+
+    def ordered(self, field: str | None = None) -> array:
+        """Return a column (or the timestamps) from oldest to newest sample."""
+        column = self._timestamps if field is None else self._columns[field]
+        if self.end <= self.capacity:
+            return column[: self.end]
+        position = self.end % self.capacity
+        return column[position:] + column[:position]
@@ -12,10 +12,14 @@ from homeassistant.components.light import (
     ColorMode, 
 )
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
-from .const import DOMAIN, DEBUG_INFO
+from .const import CONF_PROGRAM_LIGHTS, DOMAIN, SIGNAL_HUB_DEVICES_UPDATED
+from .executor import async_get_executor
 from .pentaircloud import PentairCloudHub, PentairDevice, PentairPumpProgram
 
 #from .entity import PentairDataUpdateCoordinator
@@ -30,23 +34,47 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ):
+    if not config_entry.options.get(CONF_PROGRAM_LIGHTS, True):
+        # The program select replaces the lights, drop the registered ones
+        entity_registry = er.async_get(hass)
+        for entity_entry in er.async_entries_for_config_entry(
+            entity_registry, config_entry.entry_id
+        ):
+            if entity_entry.domain == Platform.LIGHT:
+                entity_registry.async_remove(entity_entry.entity_id)
+        return
+
     hub = hass.data[DOMAIN][config_entry.entry_id]["pentair_cloud_hub"]  
     #coordinator = hass.data[DOMAIN][config_entry.entry_id]
     #hub = coordinator.api 
-
-
-    devices: list[PentairDevice] = await hass.async_add_executor_job(hub.get_devices)
-    cloud_devices = []
-    for device in devices:
-        for program in device.programs:
-            cloud_devices.append(PentairCloudLight(_LOGGER, hub, device, program))
-    async_add_entities(cloud_devices)
+    added_programs: set[tuple[str, int]] = set()
+
+    @callback
+    def _async_add_programs() -> None:
+        """Add a light for every program without one."""
+        cloud_devices = []
+        for device in hub.get_devices():
+            for program in device.programs:
+                if (device.pentair_device_id, program.id) in added_programs:
+                    continue
+                added_programs.add((device.pentair_device_id, program.id))
+                cloud_devices.append(PentairCloudLight(_LOGGER, hub, device, program))
+        if cloud_devices:
+            async_add_entities(cloud_devices)
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_HUB_DEVICES_UPDATED.format(config_entry.entry_id),
+            _async_add_programs,
+        )
+    )
+    _async_add_programs()
 
 
 class PentairCloudLight(LightEntity):
     _attr_supported_color_modes = {ColorMode.ONOFF}
     global DOMAIN
-    global DEBUG_INFO
 
     def __init__(
         self,
@@ -68,8 +96,7 @@ class PentairCloudLight(LightEntity):
             + self.pentair_program.name
         )
         self._state = self.pentair_program.running
-        if DEBUG_INFO:
-            self.LOGGER.info("Pentair Cloud Pump " + self._name + " Configured")
+        self.LOGGER.debug("Pentair Cloud Pump %s Configured", self._name)
 
     @property
     def color_mode(self) -> ColorMode | str | None:
@@ -121,55 +148,49 @@ class PentairCloudLight(LightEntity):
     @property
     def is_on(self) -> bool | None:
         """Return true if light is on."""
-        if DEBUG_INFO:
-            self.LOGGER.info(
-                "Pentair Cloud Pump "
-                + self.pentair_device.pentair_device_id
-                + " Called IS_ON"
-            )
         self._state = self.pentair_program.running
         return self._state
 
-    def turn_on(self, **kwargs) -> None:
+    async def async_turn_on(self, **kwargs) -> None:
         """Instruct the light to turn on.
         You can skip the brightness part if your light does not support
         brightness control.
         """
-        if DEBUG_INFO:
-            self.LOGGER.info(
-                "Pentair Cloud Pump "
-                + self.pentair_device.pentair_device_id
-                + " Called ON program: "
-                + str(self.pentair_program.id)
-            )
+        self.LOGGER.debug(
+            "Pentair Cloud Pump %s Called ON program: %s",
+            self.pentair_device.pentair_device_id,
+            self.pentair_program.id,
+        )
         self._state = True
-        self.hub.start_program(
-            self.pentair_device.pentair_device_id, self.pentair_program.id
+        await async_get_executor(self.hass).async_run(
+            self.hub.start_program,
+            self.pentair_device.pentair_device_id,
+            self.pentair_program.id,
         )
 
-    def turn_off(self, **kwargs) -> None:
+    async def async_turn_off(self, **kwargs) -> None:
         """Instruct the light to turn off."""
-        if DEBUG_INFO:
-            self.LOGGER.info(
-                "Pentair Cloud Pump "
-                + self.pentair_device.pentair_device_id
-                + " Called OFF program: "
-                + str(self.pentair_program.id)
-            )
+        self.LOGGER.debug(
+            "Pentair Cloud Pump %s Called OFF program: %s",
+            self.pentair_device.pentair_device_id,
+            self.pentair_program.id,
+        )
         self._state = False
-        self.hub.stop_program(
-            self.pentair_device.pentair_device_id, self.pentair_program.id
+        await async_get_executor(self.hass).async_run(
+            self.hub.stop_program,
+            self.pentair_device.pentair_device_id,
+            self.pentair_program.id,
         )
 
-    def update(self) -> None:
+    async def async_update(self) -> None:
         """Fetch new state data for this light.
         This is the only method that should fetch new data for Home Assistant.
         """
-        self.hub.update_pentair_devices_status()
+        await async_get_executor(self.hass).async_run(
+            self.hub.update_pentair_devices_status
+        )
         self._state = self.pentair_program.running
-        if DEBUG_INFO:
-            self.LOGGER.info(
-                "Pentair Cloud Pump "
-                + self.pentair_device.pentair_device_id
-                + " Called UPDATE"
-            )
+        self.LOGGER.debug(
+            "Pentair Cloud Pump %s Called UPDATE",
+            self.pentair_device.pentair_device_id,
+        )
@@ -1,12 +1,31 @@
-from pycognito import Cognito
-from homeassistant.core import HomeAssistant
-import boto3
-import requests
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
 from logging import Logger
-from requests_aws4auth import AWS4Auth
-from homeassistant.components.light import ATTR_BRIGHTNESS, PLATFORM_SCHEMA, LightEntity
 import time
-from .const import DEBUG_INFO
+from typing import TYPE_CHECKING
+from .aws import CognitoIdentityClient, SigV4Auth
+from .codec import (
+    SET_DEVICE_SUCCESS,
+    decode_devices_response,
+    decode_devices_status_response,
+    decode_jwt_claims,
+    decode_set_device_response,
+    encode_device_payload,
+    encode_devices_status_request,
+    encode_last_active_program,
+    encode_program_enable,
+)
+from .const import REQUEST_TIMEOUT
+from .singleflight import SingleFlight
+from .trace import ApiTrace
+
+# pycognito and requests are imported on first use
+if TYPE_CHECKING:
+    from botocore.config import Config
+    from pycognito import Cognito
+    import requests
 
 AWS_REGION = "us-west-2"
 AWS_USER_POOL_ID = "us-west-2_lbiduhSwD"
@@ -20,6 +39,28 @@ PENTAIR_DEVICES_2_PATH = "/device2/device2-service/user/device"
 PENTAIR_DEVICE_SERVICE_PATH = "/device/device-service/user/device/"
 UPDATE_MIN_SECONDS = 60  # Minimum time between two update requests
 PROGRAM_START_MIN_SECONDS = 30  # Minimum time between two requests to start a program
+PROGRAM_START_VALUE = 3  # Program enable value starting a program
+PROGRAM_STOP_VALUE = 2  # Program enable value stopping a program
+
+
+@cache
+def get_botocore_config() -> Config:
+    """Return the botocore configuration with the request timeouts."""
+    from botocore.config import Config  # pylint: disable=import-outside-toplevel
+
+    return Config(connect_timeout=REQUEST_TIMEOUT[0], read_timeout=REQUEST_TIMEOUT[1])
+
+
+@dataclass(frozen=True)
+class PentairCloudCredentials:
+    """Cognito id token and the AWS credentials obtained for it."""
+
+    id_token: str
+    identity_id: str
+    access_key_id: str
+    secret_access_key: str
+    session_token: str
+    expiration: float  # AWS credentials expiration timestamp
 
 
 class PentairPumpProgram:
@@ -35,14 +76,14 @@ class PentairPumpProgram:
             self.running = False
 
     def get_start_value(self) -> int:
-        return 3
+        return PROGRAM_START_VALUE
         # if self.program_type == 0:
         #    return 3
         # else:
         #    return 2
 
     def get_stop_value(self) -> int:
-        return 2
+        return PROGRAM_STOP_VALUE
         # if self.program_type == 0:
         #    return 2
         # else:
@@ -58,6 +99,24 @@ class PentairDevice:
         self.last_program_start = None
         self.active_program = None
         self.programs = []
+        self.error_count = 0
+        self.last_error: str | None = None
+
+    def update_status(self, fields: dict) -> None:
+        """Update the programs from the fields of a device2 status response."""
+        # Check running program
+        running_program = int(fields["s14"]["value"]) + 1  # Index is starting at zero
+        for i in range(
+            1, 9
+        ):  # Technically 14 but after 10 are active but do not show on the app, I don't know why
+            if fields["zp" + str(i) + "e13"]["value"] == "1":  # Program is active
+                program_type = int(fields["zp" + str(i) + "e5"]["value"])
+                self.update_program(
+                    i,
+                    fields["zp" + str(i) + "e2"]["value"],
+                    program_type,
+                    running_program,
+                )
 
     def update_program(
         self, id: int, name: str, program_type: int, running_program: int
@@ -72,31 +131,23 @@ class PentairDevice:
                     program.running = True
                 else:
                     program.running = False
-                if DEBUG_INFO:
-                    self.LOGGER.info(
-                        "Update program for device "
-                        + self.pentair_device_id
-                        + " / "
-                        + str(id)
-                        + " - "
-                        + name
-                        + " ("
-                        + str(program.running)
-                        + ")"
-                    )
+                self.LOGGER.debug(
+                    "Update program for device %s / %s - %s (%s)",
+                    self.pentair_device_id,
+                    id,
+                    name,
+                    program.running,
+                )
         if exists == False:
             self.programs.append(
                 PentairPumpProgram(id, name, program_type, running_program)
             )
-            if DEBUG_INFO:
-                self.LOGGER.info(
-                    "Found new program for device "
-                    + self.pentair_device_id
-                    + " / "
-                    + str(id)
-                    + " - "
-                    + name
-                )
+            self.LOGGER.debug(
+                "Found new program for device %s / %s - %s",
+                self.pentair_device_id,
+                id,
+                name,
+            )
 
 
 class PentairCloudHub:
@@ -116,54 +167,116 @@ class PentairCloudHub:
     def __init__(
         self,
         LOGGER: Logger,
+        session: requests.Session | None = None,
+        trace: ApiTrace | None = None,
     ) -> None:
         self.cognito_client = None
         self.LOGGER = LOGGER
-        self.AWS_TOKEN = None
-        self.AWS_IDENTITY_ID = None
-        self.AWS_ACCESS_KEY_ID = None
-        self.AWS_SECRET_ACCESS_KEY = None
-        self.AWS_SESSION_TOKEN = None
+        if session is None:
+            import requests  # pylint: disable=import-outside-toplevel
+
+            session = requests.Session()
+        self.session = session
+        self.identity_client = CognitoIdentityClient(session, AWS_REGION)
+        self.trace = trace if trace is not None else ApiTrace()
+        self.credentials: PentairCloudCredentials | None = None
+        self._auth: tuple[PentairCloudCredentials, SigV4Auth] | None = None
         self.last_update = None
+        self.flights = SingleFlight()
         self.username = None
         self.password = None
         self.devices = []
+        self.auth_method: str | None = None
+        self.auth_duration_ms: float | None = None
+
+    def get_cognito_client(self, usr: str, **tokens: str | None) -> Cognito:
+        from pycognito import Cognito  # pylint: disable=import-outside-toplevel
 
-    def get_cognito_client(self, usr: str) -> Cognito:
-        return Cognito(AWS_USER_POOL_ID, AWS_CLIENT_ID, username=usr)
+        return Cognito(
+            AWS_USER_POOL_ID,
+            AWS_CLIENT_ID,
+            username=usr,
+            botocore_config=get_botocore_config(),
+            **tokens,
+        )
 
     def get_devices(self) -> list[PentairDevice]:
         return self.devices
 
+    def get_token_expiration(self) -> float:
+        """Return the expiration timestamp of the Cognito tokens."""
+        if self.cognito_client is None or not self.cognito_client.access_token:
+            return 0
+        return decode_jwt_claims(self.cognito_client.access_token)["exp"]
+
+    def credentials_valid(self, margin: float = 0) -> bool:
+        """Return True if the credentials are still valid in margin seconds."""
+        deadline = time.time() + margin
+        return (
+            self.cognito_client is not None
+            and self.credentials is not None
+            and self.credentials.id_token == self.cognito_client.id_token
+            and self.credentials.expiration > deadline
+            and self.get_token_expiration() > deadline
+        )
+
+    def refresh_credentials(self, margin: float = 0) -> None:
+        """Refresh the tokens and AWS credentials expiring within margin seconds.
+
+        The new credentials are built aside and swapped in with a single
+        assignment, so concurrent requests keep using a consistent set.
+        Concurrent refreshes share a single one, whatever their margin. A
+        caller that joined a refresh with a smaller margin runs its own once
+        that one is done, if the credentials still expire within its margin.
+        """
+        self.flights.do("credentials", self._refresh_credentials, margin)
+        if margin and not self.credentials_valid(margin):
+            self.flights.do("credentials", self._refresh_credentials, margin)
+
+    def _refresh_credentials(self, margin: float) -> None:
+        if self.cognito_client is None or self.credentials_valid(margin):
+            return
+        if self.get_token_expiration() <= time.time() + margin:
+            self.cognito_client.renew_access_token()
+        id_token = self.cognito_client.id_token
+        credentials = self.credentials
+        if (
+            credentials is None
+            or credentials.id_token != id_token
+            or credentials.expiration <= time.time() + margin
+        ):
+            self.credentials = self.get_AWS_credentials(id_token)
+
+    def get_AWS_credentials(self, id_token: str) -> PentairCloudCredentials:
+        logins = {AWS_COGNITO_ENDPOINT + "/" + AWS_USER_POOL_ID: id_token}
+        # IdentityId
+        identity_id = self.identity_client.get_id(AWS_IDENTITY_POOL_ID, logins)
+        # Credentials for Identity
+        response = self.identity_client.get_credentials_for_identity(
+            identity_id, logins
+        )
+        return PentairCloudCredentials(
+            id_token=id_token,
+            identity_id=identity_id,
+            access_key_id=response["AccessKeyId"],
+            secret_access_key=response["SecretKey"],
+            session_token=response["SessionToken"],
+            expiration=float(response["Expiration"]),
+        )
+
     def populate_AWS_token(self) -> None:
-        if self.cognito_client is not None:
-            self.cognito_client.check_token()
-            new_token = self.cognito_client.get_user()._metadata["id_token"]
-            if self.AWS_TOKEN != new_token:  # Token has been refreshed
-                self.AWS_TOKEN = new_token
-                self.populate_AWS_and_data_fields()
+        """Make sure the credentials are valid, refreshing them inline if not.
+
+        The background refresh normally renews them ahead of expiry, so this
+        only refreshes when it did not run.
+        """
+        if not self.credentials_valid():
+            self.refresh_credentials()
 
     def populate_AWS_and_data_fields(self) -> None:
-        if self.AWS_TOKEN is None:
-            self.populate_AWS_token()
         try:
-            client = boto3.client("cognito-identity", region_name=AWS_REGION)
-            # IdentityId
-            response = client.get_id(
-                IdentityPoolId=AWS_IDENTITY_POOL_ID,
-                Logins={AWS_COGNITO_ENDPOINT + "/" + AWS_USER_POOL_ID: self.AWS_TOKEN},
-            )
-            self.AWS_IDENTITY_ID = response["IdentityId"]
-            # Credentials for Identity
-            response = client.get_credentials_for_identity(
-                IdentityId=self.AWS_IDENTITY_ID,
-                Logins={AWS_COGNITO_ENDPOINT + "/" + AWS_USER_POOL_ID: self.AWS_TOKEN},
-            )
-            self.AWS_ACCESS_KEY_ID = response["Credentials"]["AccessKeyId"]
-            self.AWS_SECRET_ACCESS_KEY = response["Credentials"]["SecretKey"]
-            self.AWS_SESSION_TOKEN = response["Credentials"]["SessionToken"]
-            if DEBUG_INFO:
-                self.LOGGER.info("Pentair Cloud complete Populate AWS Fields")
+            self.refresh_credentials()
+            self.LOGGER.debug("Pentair Cloud complete Populate AWS Fields")
             self.populate_pentair_devices()
         except Exception as err:
             self.LOGGER.error(
@@ -171,59 +284,103 @@ class PentairCloudHub:
                 err,
             )
 
-    def get_pentair_header(self) -> str:
+    def get_pentair_header(
+        self, credentials: PentairCloudCredentials
+    ) -> dict[str, str]:
         return {
-            "x-amz-id-token": self.AWS_TOKEN,
+            "x-amz-id-token": credentials.id_token,
             "user-agent": "aws-amplify/4.3.10 react-native",
             "content-type": "application/json; charset=UTF-8",
         }
 
-    def get_AWS_auth(self) -> AWS4Auth:
-        return AWS4Auth(
-            self.AWS_ACCESS_KEY_ID,
-            self.AWS_SECRET_ACCESS_KEY,
+    def request(
+        self,
+        credentials: PentairCloudCredentials,
+        method: str,
+        path: str,
+        device_id: str | None = None,
+        data: bytes | None = None,
+    ) -> requests.Response:
+        """Send a signed request to the Pentair API and trace it.
+
+        Device scoped paths end with a slash and are completed by the device id.
+        """
+        url = PENTAIR_ENDPOINT + path
+        if device_id is not None and path.endswith("/"):
+            url += device_id
+        with self.trace.call(method + " " + path, device_id) as call:
+            response = self.session.request(
+                method,
+                url,
+                auth=self.get_AWS_auth(credentials),
+                headers=self.get_pentair_header(credentials),
+                data=data,
+                timeout=REQUEST_TIMEOUT,
+            )
+            call.status = response.status_code
+        return response
+
+    def get_AWS_auth(self, credentials: PentairCloudCredentials) -> SigV4Auth:
+        """Return the signer of the credentials, reused until they change."""
+        if (auth := self._auth) is not None and auth[0] is credentials:
+            return auth[1]
+        signer = SigV4Auth(
+            credentials.access_key_id,
+            credentials.secret_access_key,
             AWS_REGION,
             "execute-api",
-            session_token=self.AWS_SESSION_TOKEN,
+            session_token=credentials.session_token,
         )
+        self._auth = (credentials, signer)
+        return signer
+
+    def remove_device(self, device_id: str) -> None:
+        self.devices = [
+            device for device in self.devices if device.pentair_device_id != device_id
+        ]
+
+    def populate_pentair_devices(self) -> list[PentairDevice]:
+        """Discover the compatible devices, return the ones not known yet.
+
+        Concurrent callers share a single discovery.
+        """
+        return self.flights.do("devices", self._populate_pentair_devices)
 
-    def populate_pentair_devices(self) -> None:
-        if self.AWS_TOKEN is not None:
+    def _populate_pentair_devices(self) -> list[PentairDevice]:
+        new_devices = []
+        if (credentials := self.credentials) is not None:
+            known_device_ids = {device.pentair_device_id for device in self.devices}
             try:
                 # GetDeviceConfiguration
-                endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICES_PATH
-                response = requests.get(
-                    endpoint,
-                    auth=self.get_AWS_auth(),
-                    headers=self.get_pentair_header(),
-                )
-                for device in response.json()["data"]:
+                response = self.request(credentials, "GET", PENTAIR_DEVICES_PATH)
+                for device in decode_devices_response(response.content)["data"]:
                     if device["deviceType"] == "IF31":
+                        if device["deviceId"] in known_device_ids:
+                            continue
                         if device["status"] == "ACTIVE":
-                            self.devices.append(
+                            new_devices.append(
                                 PentairDevice(
                                     self.LOGGER,
                                     device["deviceId"],
                                     device["productInfo"]["nickName"],
                                 )
                             )
-                            if DEBUG_INFO:
-                                self.LOGGER.info(
-                                    "Found compatible device:" + device["deviceId"]
-                                )
+                            self.LOGGER.debug(
+                                "Found compatible device: %s", device["deviceId"]
+                            )
                         else:
-                            if DEBUG_INFO:
-                                self.LOGGER.warning(
-                                    "Found inactive device:" + device["deviceId"]
-                                )
-                    else:
-                        if DEBUG_INFO:
-                            self.LOGGER.warning(
-                                "Incompatible device"
-                                + device["deviceType"]
-                                + "/"
-                                + device["pname"]
+                            self.LOGGER.debug(
+                                "Found inactive device: %s", device["deviceId"]
                             )
+                    else:
+                        self.LOGGER.debug(
+                            "Incompatible device %s/%s",
+                            device["deviceType"],
+                            device["pname"],
+                        )
+                if new_devices:
+                    self.devices.extend(new_devices)
+                    self.last_update = None  # Fetch the programs of the new devices
                 self.update_pentair_devices_status()
             except Exception as err:
                 self.LOGGER.error(
@@ -234,91 +391,83 @@ class PentairCloudHub:
             self.LOGGER.error(
                 "Exception while setting up Pentair Cloud (Empty token in populate Pentair Device ID)."
             )
+        return new_devices
 
     def update_pentair_devices_status(self) -> None:
+        """Update the status of the devices, at most every UPDATE_MIN_SECONDS.
+
+        Concurrent callers share a single request, which also makes the
+        last_update check and update atomic.
+        """
+        self.flights.do("status", self._update_pentair_devices_status)
+
+    def _update_pentair_devices_status(self) -> None:
         if (
             self.last_update == None
             or time.time() - self.last_update > UPDATE_MIN_SECONDS
         ):
-            if DEBUG_INFO:
-                self.LOGGER.info("Pentair Cloud - Update Devices Status")
+            self.LOGGER.debug("Pentair Cloud - Update Devices Status")
             self.last_update = time.time()
             self.populate_AWS_token()
-            if self.AWS_TOKEN is not None:
+            if (credentials := self.credentials) is not None:
+                response_data = None
                 try:
-                    devices_json_list = []
-                    for device in self.devices:
-                        devices_json_list.append('"' + device.pentair_device_id + '"')
-                    devices_json = (
-                        '{"deviceIds": [' + ",".join(devices_json_list) + "]}"
+                    devices_json = encode_devices_status_request(
+                        [device.pentair_device_id for device in self.devices]
                     )
-                    # devices_json = '{"deviceIds": ["' + deviceId + '"]}'
-                    endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICES_2_PATH
-                    response = requests.post(
-                        endpoint,
-                        auth=self.get_AWS_auth(),
-                        headers=self.get_pentair_header(),
-                        data=devices_json,
+                    response = self.request(
+                        credentials, "POST", PENTAIR_DEVICES_2_PATH, data=devices_json
                     )
-                    response_data = response.json()
-                    for device_response in response_data["response"]["data"]:
-                        for device in self.devices:
-                            if device.pentair_device_id == device_response["deviceId"]:
-                                # Check running program
-                                running_program = (
-                                    int(device_response["fields"]["s14"]["value"]) + 1
-                                )  # Index is starting at zero
-                                for i in range(
-                                    1, 9
-                                ):  # Technically 14 but after 10 are active but do not show on the app, I don't know why
-                                    if (
-                                        device_response["fields"][
-                                            "zp" + str(i) + "e13"
-                                        ]["value"]
-                                        == "1"
-                                    ):  # Program is active
-                                        program_type = int(
-                                            device_response["fields"][
-                                                "zp" + str(i) + "e5"
-                                            ]["value"]
-                                        )
-                                        device.update_program(
-                                            i,
-                                            device_response["fields"][
-                                                "zp" + str(i) + "e2"
-                                            ]["value"],
-                                            program_type,
-                                            running_program,
-                                        )
-
+                    response_data = decode_devices_status_response(response.content)
+                    device_responses = response_data["response"]["data"]
                 except Exception as err:
                     self.LOGGER.error(
                         "Exception while updating Pentair Cloud (update device status). %s, %s",
                         err,
                         response_data,
                     )
-                    try:
-                        self.LOGGER.error("Timeout detected. Logging Again")
-                        if "timeout" in response_data["message"]:
+                    if isinstance(response_data, dict) and "timeout" in str(
+                        response_data.get("message", "")
+                    ):
+                        self.LOGGER.warning("Timeout detected. Logging Again")
+                        try:
                             self.authenticate(
                                 self.username, self.password
                             )  # Refresh authentication in case of timeout
-                    except Exception as err2:
-                        self.LOGGER.error(
-                            "ERROR in Timeout detection loop.",
-                            err2,
+                        except Exception as err2:
+                            self.LOGGER.error(
+                                "ERROR in Timeout detection loop. %s",
+                                err2,
+                            )
+                    return
+                devices = {device.pentair_device_id: device for device in self.devices}
+                for device_response in device_responses:
+                    if (device := devices.get(device_response.get("deviceId"))) is None:
+                        continue
+                    # A malformed device must not prevent updating the others
+                    try:
+                        device.update_status(device_response["fields"])
+                    except Exception as err:
+                        device.error_count += 1
+                        device.last_error = f"{type(err).__name__}: {err}"
+                        self.LOGGER.warning(
+                            "Exception while updating Pentair device %s status (%s errors). %s",
+                            device.pentair_device_id,
+                            device.error_count,
+                            device.last_error,
                         )
             else:
                 self.LOGGER.error(
                     "Exception while updating Pentair Cloud (Empty token in device status)."
                 )
         else:
-            if DEBUG_INFO:
-                self.LOGGER.info(
-                    "Pentair Cloud - Update Devices Status Requested but before min time"
-                )
+            self.LOGGER.debug(
+                "Pentair Cloud - Update Devices Status Requested but before min time"
+            )
 
-    def start_program(self, deviceId: str, program_id: int) -> None:
+    def find_program(
+        self, deviceId: str, program_id: int
+    ) -> tuple[PentairDevice | None, PentairPumpProgram | None]:
         device = None
         program = None
         for device_l in self.devices:
@@ -327,55 +476,132 @@ class PentairCloudHub:
                 for program_l in device.programs:
                     if program_l.id == program_id:
                         program = program_l
+        return device, program
+
+    def switch_program(
+        self,
+        credentials: PentairCloudCredentials,
+        device: PentairDevice,
+        program: PentairPumpProgram,
+        running: bool,
+    ) -> None:
+        """Start or stop a program with the given credentials, raise on failure."""
+        # Enable the program
+        response = self.request(
+            credentials,
+            "PUT",
+            PENTAIR_DEVICE_SERVICE_PATH,
+            device.pentair_device_id,
+            data=encode_program_enable(
+                program.id,
+                program.get_start_value() if running else program.get_stop_value(),
+            ),
+        )
+        response_data = decode_set_device_response(response.content)
+        if response_data["data"]["code"] != SET_DEVICE_SUCCESS:
+            raise Exception(
+                "Wrong response code " + ("start" if running else "stop") + " program"
+            )
+        device.active_program = program.id if running else None
+        program.running = running
+        # Update "Last Active Program". Don't know why, but the app is doing that...
+        self.request(
+            credentials,
+            "PUT",
+            PENTAIR_DEVICE_SERVICE_PATH,
+            device.pentair_device_id,
+            data=encode_last_active_program(99 if running else program.id - 1),
+        )
+
+    def set_program(
+        self,
+        credentials: PentairCloudCredentials,
+        deviceId: str,
+        program_id: int,
+        running: bool,
+    ) -> None:
+        """Start or stop a program of a bulk request, raise on failure.
+
+        The credentials are checked once by the caller for the whole request,
+        and the minimum time between two starts is not enforced.
+        """
+        device, program = self.find_program(deviceId, program_id)
+        if device is None or program is None:
+            raise ValueError(
+                "Program " + str(program_id) + " not found on device " + deviceId
+            )
+        if running:
+            if device.active_program not in (None, program_id):
+                _, active_program = self.find_program(deviceId, device.active_program)
+                if active_program is not None:  # Stop previous program
+                    self.switch_program(credentials, device, active_program, False)
+            device.last_program_start = time.time()
+        self.switch_program(credentials, device, program, running)
+
+    def select_program(
+        self,
+        credentials: PentairCloudCredentials,
+        deviceId: str,
+        program_id: int | None,
+        previous_id: int | None,
+    ) -> None:
+        """Run a program (None stops the running one) in a single request.
+
+        Stopping the previous program, starting the new one and the last
+        active program are sent in one payload, so the pump never sees a
+        half done switch. Raise on failure.
+        """
+        if program_id == previous_id:
+            return
+        payload: dict[str, str] = {}
+        if previous_id is not None:
+            payload[f"zp{previous_id}e10"] = str(PROGRAM_STOP_VALUE)
+        if program_id is not None:
+            payload[f"zp{program_id}e10"] = str(PROGRAM_START_VALUE)
+        # Last active program, as the app does (see switch_program)
+        payload["p2"] = str(99 if program_id is not None else previous_id - 1)
+        response = self.request(
+            credentials,
+            "PUT",
+            PENTAIR_DEVICE_SERVICE_PATH,
+            deviceId,
+            data=encode_device_payload(payload),
+        )
+        response_data = decode_set_device_response(response.content)
+        if response_data["data"]["code"] != SET_DEVICE_SUCCESS:
+            raise Exception("Wrong response code select program")
+        for device in self.devices:  # Keep the program lights in sync
+            if device.pentair_device_id != deviceId:
+                continue
+            device.active_program = program_id
+            for program in device.programs:
+                program.running = program.id == program_id
+            if program_id is not None:
+                device.last_program_start = time.time()
+
+    def start_program(self, deviceId: str, program_id: int) -> None:
+        device, program = self.find_program(deviceId, program_id)
         if device is None or program is None:
             self.LOGGER.error(
-                "Pentair Cloud - PROGRAM/DEVICE Not Found - Start program "
-                + str(program_id)
-                + " on device "
-                + deviceId
+                "Pentair Cloud - PROGRAM/DEVICE Not Found - Start program %s on device %s",
+                program_id,
+                deviceId,
             )
             return
         if (
             device.last_program_start == None
             or time.time() - device.last_program_start > PROGRAM_START_MIN_SECONDS
         ):
-            if DEBUG_INFO:
-                self.LOGGER.info(
-                    "Pentair Cloud - Start program "
-                    + str(program_id)
-                    + " on device "
-                    + deviceId
-                )
+            self.LOGGER.debug(
+                "Pentair Cloud - Start program %s on device %s", program_id, deviceId
+            )
             if device.active_program is not None:  # Stop previous program
                 self.stop_program(deviceId, device.active_program)
             device.last_program_start = time.time()
             self.populate_AWS_token()
-            if self.AWS_TOKEN is not None:
+            if (credentials := self.credentials) is not None:
                 try:
-                    endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICE_SERVICE_PATH + deviceId
-                    # Enable the program
-                    response = requests.put(
-                        endpoint,
-                        auth=self.get_AWS_auth(),
-                        headers=self.get_pentair_header(),
-                        data='{"payload":{"zp'
-                        + str(program_id)
-                        + 'e10":"'
-                        + str(program.get_start_value())
-                        + '"}}',
-                    )
-                    response_data = response.json()
-                    if response_data["data"]["code"] != "set_device_success":
-                        raise Exception("Wrong response code start program")
-                    device.active_program = program_id
-                    program.running = True
-                    # Update "Last Active Program". Don't know why, but the app is doing that...
-                    response = requests.put(
-                        endpoint,
-                        auth=self.get_AWS_auth(),
-                        headers=self.get_pentair_header(),
-                        data='{"payload":{"p2":"99"}}',
-                    )
+                    self.switch_program(credentials, device, program, True)
                 except Exception as err:
                     self.LOGGER.error(
                         "Exception with Pentair API (Start Program). %s",
@@ -386,62 +612,26 @@ class PentairCloudHub:
                     "Exception while starting program (Empty token in device status)."
                 )
         else:
-            if DEBUG_INFO:
-                self.LOGGER.info(
-                    "Pentair Cloud - Start program Requested but before min time"
-                )
+            self.LOGGER.debug(
+                "Pentair Cloud - Start program Requested but before min time"
+            )
 
     def stop_program(self, deviceId: str, program_id: int) -> None:
-        device = None
-        program = None
-        for device_l in self.devices:
-            if device_l.pentair_device_id == deviceId:
-                device = device_l
-                for program_l in device.programs:
-                    if program_l.id == program_id:
-                        program = program_l
+        device, program = self.find_program(deviceId, program_id)
         if device is None or program is None:
             self.LOGGER.error(
-                "Pentair Cloud - PROGRAM/DEVICE Not Found - Stop program "
-                + str(program_id)
-                + " on device "
-                + deviceId
+                "Pentair Cloud - PROGRAM/DEVICE Not Found - Stop program %s on device %s",
+                program_id,
+                deviceId,
             )
             return
-        if DEBUG_INFO:
-            self.LOGGER.info(
-                "Pentair Cloud - Stop program "
-                + str(program_id)
-                + " on device "
-                + deviceId
-            )
+        self.LOGGER.debug(
+            "Pentair Cloud - Stop program %s on device %s", program_id, deviceId
+        )
         self.populate_AWS_token()
-        if self.AWS_TOKEN is not None:
+        if (credentials := self.credentials) is not None:
             try:
-                endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICE_SERVICE_PATH + deviceId
-                # Enable the program
-                response = requests.put(
-                    endpoint,
-                    auth=self.get_AWS_auth(),
-                    headers=self.get_pentair_header(),
-                    data='{"payload":{"zp'
-                    + str(program_id)
-                    + 'e10":"'
-                    + str(program.get_stop_value())
-                    + '"}}',
-                )
-                response_data = response.json()
-                if response_data["data"]["code"] != "set_device_success":
-                    raise Exception("Wrong response code stop program")
-                device.active_program = None
-                program.running = False
-                # Update "Last Active Program"
-                response = requests.put(
-                    endpoint,
-                    auth=self.get_AWS_auth(),
-                    headers=self.get_pentair_header(),
-                    data='{"payload":{"p2":"' + str(program_id - 1) + '"}}',
-                )
+                self.switch_program(credentials, device, program, False)
             except Exception as err:
                 self.LOGGER.error(
                     "Exception with Pentair API (Stop Program). %s",
@@ -464,5 +654,48 @@ class PentairCloudHub:
             return True
 
         except Exception as err:
-            self.LOGGER.error("Exception while logging with Pentair Cloud. %s. Id: %s  / Pwd: %s", err, username, password)
+            self.LOGGER.error("Exception while logging with Pentair Cloud. %s. Id: %s", err, username)
             return False
+
+    def resume(
+        self, username: str, password: str, tokens: dict[str, str | None]
+    ) -> bool:
+        """Resume the session from persisted Cognito tokens.
+
+        The tokens share the user pool of the pypentair client. The access
+        token is renewed with the refresh token when it expired, and only
+        when this fails does a full SRP login run from the password.
+        """
+        start = time.perf_counter()
+        self.username = username
+        self.password = password
+        try:
+            if tokens.get("refresh_token"):
+                try:
+                    u = self.get_cognito_client(
+                        username,
+                        id_token=tokens.get("id_token"),
+                        access_token=tokens.get("access_token"),
+                        refresh_token=tokens["refresh_token"],
+                    )
+                    if u.access_token:
+                        u.check_token()  # Renews the expired tokens
+                    else:
+                        u.renew_access_token()
+                    self.cognito_client = u
+                    self.auth_method = "tokens"
+                    return True
+                except Exception as err:
+                    self.LOGGER.debug(
+                        "Could not resume the Pentair Cloud session, logging in. %s",
+                        err,
+                    )
+            self.auth_method = "srp"
+            return self.authenticate(username, password)
+        finally:
+            self.auth_duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.LOGGER.debug(
+                "Pentair Cloud authentication (%s) took %s ms",
+                self.auth_method,
+                self.auth_duration_ms,
+            )
@@ -0,0 +1,102 @@
+"""Batched poll loop of a Pentair config entry."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CONF_DEVICE_INTERVALS,
+    CONF_DEVICE_TYPE_INTERVALS,
+    DEVICE_TYPE_INTERVALS,
+    DOMAIN,
+)
+from .coordinator import (
+    UPDATE_INTERVAL,
+    PentairDataUpdateCoordinator,
+    PentairDeviceDataUpdateCoordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_TICK_INTERVAL = 5  # seconds, resolution of the device intervals
+
+
+def get_poll_interval(entry: ConfigEntry, device_id: str, device_type: str | None) -> int:
+    """Return the polling interval of a device, in seconds.
+
+    A per device override wins over the interval of the device type, which
+    defaults to DEVICE_TYPE_INTERVALS.
+    """
+    if interval := entry.options.get(CONF_DEVICE_INTERVALS, {}).get(device_id):
+        return int(interval)
+    if option := CONF_DEVICE_TYPE_INTERVALS.get(device_type):
+        return int(
+            entry.options.get(option, DEVICE_TYPE_INTERVALS[device_type])
+        )
+    return UPDATE_INTERVAL
+
+
+class PentairPollLoop:
+    """Poll the device coordinators of a config entry on their own cadence.
+
+    A single timer replaces the timers of the device coordinators. Every
+    tick refreshes the coordinators whose interval elapsed, so slow
+    moving devices (sump monitors, salt sensors) cost a request every few
+    minutes and the pumps keep a tight cadence. Followers are refreshed by
+    the registry fan-out and are never due.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: PentairDataUpdateCoordinator
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._in_flight: set[PentairDeviceDataUpdateCoordinator] = set()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start the loop, return the callback stopping it."""
+        return async_track_time_interval(
+            self.hass, self._async_tick, timedelta(seconds=POLL_TICK_INTERVAL)
+        )
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Refresh the device coordinators that are due.
+
+        A coordinator whose previous refresh still runs is skipped, the
+        others are not held back by it.
+        """
+        monotonic = time.monotonic()
+        due = [
+            device_coordinator
+            for device_coordinator in self.coordinator.device_coordinators
+            if device_coordinator not in self._in_flight
+            and device_coordinator.poll_due(monotonic)
+        ]
+        if not due:
+            return
+        _LOGGER.debug("Polling %s Pentair devices", len(due))
+        for device_coordinator in due:
+            self._in_flight.add(device_coordinator)
+            self.coordinator.config_entry.async_create_background_task(
+                self.hass,
+                self._async_refresh(device_coordinator),
+                f"{DOMAIN} poll {device_coordinator.device_id}",
+            )
+
+    async def _async_refresh(
+        self, device_coordinator: PentairDeviceDataUpdateCoordinator
+    ) -> None:
+        """Refresh a device coordinator, tracking it while in flight."""
+        try:
+            await device_coordinator.async_refresh()
+        finally:
+            self._in_flight.discard(device_coordinator)
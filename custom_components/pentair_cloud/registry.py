@@ -0,0 +1,116 @@
+"""Domain level registry shared by the Pentair config entries."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import requests
+
+    from .coordinator import PentairDeviceDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HUB_REGISTRY = "hub_registry"
+
+
+@callback
+def async_get_hub_registry(hass: HomeAssistant) -> PentairHubRegistry:
+    """Get (or create) the hub registry of the domain."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (registry := domain_data.get(DATA_HUB_REGISTRY)) is None:
+        registry = domain_data[DATA_HUB_REGISTRY] = PentairHubRegistry()
+    return registry
+
+
+class PentairHubRegistry:
+    """Share the HTTP pool and the device polling between config entries.
+
+    Several accounts (e.g. owner and installer) can see the same device. The
+    first coordinator registered for a device polls it, and its snapshots are
+    fanned out to the coordinators of the other entries, which do not poll.
+    Each entry keeps its own client and authentication.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        import requests  # pylint: disable=import-outside-toplevel
+
+        self.session: requests.Session = requests.Session()
+        self._coordinators: dict[str, list[PentairDeviceDataUpdateCoordinator]] = {}
+
+    @property
+    def shared_devices(self) -> list[str]:
+        """Return the devices seen by more than one config entry."""
+        return [
+            device_id
+            for device_id, coordinators in self._coordinators.items()
+            if len(coordinators) > 1
+        ]
+
+    def get_poller(
+        self, device_id: str
+    ) -> PentairDeviceDataUpdateCoordinator | None:
+        """Return the coordinator polling a device."""
+        if coordinators := self._coordinators.get(device_id):
+            return coordinators[0]
+        return None
+
+    @callback
+    def async_register(self, coordinator: PentairDeviceDataUpdateCoordinator) -> None:
+        """Register a device coordinator."""
+        coordinators = self._coordinators.setdefault(coordinator.device_id, [])
+        # Drop what a previous setup attempt of the same entry left behind
+        coordinators[:] = [
+            registered
+            for registered in coordinators
+            if registered.config_entry.entry_id != coordinator.config_entry.entry_id
+        ]
+        coordinators.append(coordinator)
+        coordinator.async_set_follower(len(coordinators) > 1)
+        if len(coordinators) > 1:
+            _LOGGER.debug(
+                "Device %s is shared by %s config entries, polled by %s",
+                coordinator.device_id,
+                len(coordinators),
+                coordinators[0].config_entry.entry_id,
+            )
+
+    @callback
+    def async_unregister(
+        self, coordinator: PentairDeviceDataUpdateCoordinator
+    ) -> None:
+        """Unregister a device coordinator, promote a follower if it polled."""
+        if not (coordinators := self._coordinators.get(coordinator.device_id)):
+            return
+        was_poller = coordinators[0] is coordinator
+        if coordinator in coordinators:
+            coordinators.remove(coordinator)
+        if not coordinators:
+            del self._coordinators[coordinator.device_id]
+        elif was_poller:
+            coordinators[0].async_set_follower(False)
+            coordinator.hass.async_create_task(coordinators[0].async_request_refresh())
+
+    @callback
+    def async_fan_out(
+        self, coordinator: PentairDeviceDataUpdateCoordinator, device: Any
+    ) -> None:
+        """Push a snapshot fetched by a coordinator to the other entries."""
+        for other in self._coordinators.get(coordinator.device_id, []):
+            if other is not coordinator:
+                other.async_set_polled_data(device)
+
+    @callback
+    def async_fan_out_failure(
+        self, coordinator: PentairDeviceDataUpdateCoordinator, err: Exception
+    ) -> None:
+        """Mark the device unavailable in the other entries as well."""
+        for other in self._coordinators.get(coordinator.device_id, []):
+            if other is not coordinator:
+                other.async_set_update_error(err)
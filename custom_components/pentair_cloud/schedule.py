@@ -0,0 +1,178 @@
+"""Weekly schedule index for Pentair pump programs.
+
+The program fields of a pump are named zp<id><field>, program ids 1 to 14.
+Their meaning is inferred from the payloads of the cloud app, Pentair
+does not document them:
+- e2: program name,
+- e5: program type, 0 for a schedule (1 interval, 2 manual),
+- e6: start time, in minutes after midnight (local time of the pump),
+- e7: duration, in minutes,
+- e8: days the program runs, a bit mask with bit 0 for Monday,
+- e10: 0 when the program is disabled,
+- e13: 1 when the program exists.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+PROGRAM_IDS = range(1, 15)
+PROGRAM_SCHEDULE_FIELDS = ("e2", "e5", "e6", "e7", "e8", "e10", "e13")
+PROGRAM_TYPE_SCHEDULE = 0  # 0=Schedule, 1=Interval, 2=Manual
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+@dataclass(frozen=True)
+class ScheduledProgram:
+    """A program that runs on a weekly schedule.
+
+    start and duration are in minutes, days is a bit mask with bit 0 for
+    Monday (as datetime.weekday()).
+    """
+
+    id: int
+    name: str
+    start: int
+    duration: int
+    days: int
+
+
+def _field(fields: dict[str, Any], key: str) -> Any:
+    """Return the raw value of a payload field."""
+    value = fields.get(key)
+    return value.get("value") if isinstance(value, dict) else value
+
+
+def parse_programs(fields: dict[str, Any]) -> dict[int, str]:
+    """Return the names of the existing programs of a device payload."""
+    return {
+        program_id: str(_field(fields, f"zp{program_id}e2") or f"P{program_id}")
+        for program_id in PROGRAM_IDS
+        if str(_field(fields, f"zp{program_id}e13")) == "1"
+    }
+
+
+def parse_running_program(fields: dict[str, Any]) -> int | None:
+    """Return the id of the program the pump runs, None if it runs none."""
+    try:
+        program_id = int(_field(fields, "s14")) + 1  # Index is starting at zero
+    except (TypeError, ValueError):
+        return None
+    return program_id if program_id in PROGRAM_IDS else None
+
+
+def parse_scheduled_programs(fields: dict[str, Any]) -> list[ScheduledProgram]:
+    """Return the enabled schedule programs of a device payload."""
+    programs = []
+    for program_id in PROGRAM_IDS:
+        prefix = f"zp{program_id}"
+        if str(_field(fields, f"{prefix}e13")) != "1":  # Program does not exist
+            continue
+        try:
+            if (
+                int(_field(fields, f"{prefix}e5")) != PROGRAM_TYPE_SCHEDULE
+                or int(_field(fields, f"{prefix}e10")) == 0
+            ):
+                continue
+            program = ScheduledProgram(
+                id=program_id,
+                name=str(_field(fields, f"{prefix}e2") or f"P{program_id}"),
+                start=int(_field(fields, f"{prefix}e6")) % MINUTES_PER_DAY,
+                duration=min(int(_field(fields, f"{prefix}e7")), MINUTES_PER_WEEK),
+                days=int(_field(fields, f"{prefix}e8")),
+            )
+        except (TypeError, ValueError):
+            continue
+        if program.duration > 0 and program.days & 0x7F:
+            programs.append(program)
+    return programs
+
+
+class PentairScheduleIndex:
+    """Precomputed weekly schedule of a pump.
+
+    The week is cut into segments at every program start and end, each
+    segment holding the program expected to run (the one that started last
+    when programs overlap). Adjacent segments running the same program are
+    merged so every boundary is a transition, and lookups are a bisect over
+    the boundaries, O(log n).
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._signature: tuple | None = None
+        self.programs: list[ScheduledProgram] = []
+        self._boundaries: list[int] = [0]
+        self._active: list[ScheduledProgram | None] = [None]
+
+    def update(self, fields: dict[str, Any]) -> bool:
+        """Rebuild the index when the program fields changed, return True if so."""
+        signature = tuple(
+            _field(fields, f"zp{program_id}{field}")
+            for program_id in PROGRAM_IDS
+            for field in PROGRAM_SCHEDULE_FIELDS
+        )
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self.programs = parse_scheduled_programs(fields)
+        self._build()
+        return True
+
+    def _build(self) -> None:
+        """Build the segments of the week."""
+        intervals: list[tuple[int, int, ScheduledProgram]] = []
+        for program in self.programs:
+            for day in range(7):
+                if not program.days & (1 << day):
+                    continue
+                start = day * MINUTES_PER_DAY + program.start
+                end = start + program.duration
+                intervals.append((start, min(end, MINUTES_PER_WEEK), program))
+                if end > MINUTES_PER_WEEK:  # Wraps to the start of the week
+                    intervals.append((0, end - MINUTES_PER_WEEK, program))
+
+        points = sorted({0, *(i[0] for i in intervals), *(i[1] for i in intervals)})
+        boundaries: list[int] = []
+        active: list[ScheduledProgram | None] = []
+        for point in points:
+            if point >= MINUTES_PER_WEEK:
+                break
+            running = [i for i in intervals if i[0] <= point < i[1]]
+            program = max(running, key=lambda i: i[0])[2] if running else None
+            if active and active[-1] == program:
+                continue
+            boundaries.append(point)
+            active.append(program)
+        self._boundaries = boundaries
+        self._active = active
+
+    @staticmethod
+    def _minute_of_week(when: datetime) -> int:
+        """Return the minute of the week of a (local) datetime."""
+        return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+    def program_at(self, when: datetime) -> ScheduledProgram | None:
+        """Return the program expected to run at a (local) datetime."""
+        index = bisect_right(self._boundaries, self._minute_of_week(when)) - 1
+        return self._active[index]
+
+    def next_transition(self, when: datetime) -> datetime | None:
+        """Return when the expected program changes after a (local) datetime."""
+        if len(self._boundaries) < 2:
+            return None
+        minute = self._minute_of_week(when)
+        index = bisect_right(self._boundaries, minute)
+        if index < len(self._boundaries):
+            target = self._boundaries[index]
+        elif self._active[0] != self._active[-1]:
+            target = MINUTES_PER_WEEK
+        else:  # The week start boundary is not a transition
+            target = MINUTES_PER_WEEK + self._boundaries[1]
+        return when.replace(second=0, microsecond=0) + timedelta(
+            minutes=target - minute
+        )
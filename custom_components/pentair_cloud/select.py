@@ -0,0 +1,159 @@
+"""Support for Pentair program selects."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.select import SelectEntity, SelectEntityDescription
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, SIGNAL_DEVICE_ADDED
+from .coordinator import (
+    PentairDataUpdateCoordinator,
+    PentairDeviceDataUpdateCoordinator,
+)
+from .entity import PentairEntity
+from .schedule import parse_programs, parse_running_program
+
+_LOGGER = logging.getLogger(__name__)
+
+PROGRAM_OFF = "off"
+
+PROGRAM_SELECT_DESCRIPTION = SelectEntityDescription(
+    key="program",
+    translation_key="program",
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Pentair program selects using config entry."""
+    coordinator: PentairDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]["pypentair_coordinator"]
+
+    @callback
+    def _async_add_device(device_coordinator: PentairDeviceDataUpdateCoordinator) -> None:
+        """Add the program select of a device discovered after setup."""
+        if entities := _get_device_entities(device_coordinator, config_entry):
+            async_add_entities(entities)
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICE_ADDED.format(config_entry.entry_id), _async_add_device
+        )
+    )
+
+    entities: list[SelectEntity] = []
+    for device_coordinator in coordinator.device_coordinators:
+        entities.extend(_get_device_entities(device_coordinator, config_entry))
+
+    if not entities:
+        return
+
+    async_add_entities(entities)
+
+
+def _get_device_entities(
+    device_coordinator: PentairDeviceDataUpdateCoordinator, config_entry: ConfigEntry
+) -> list[SelectEntity]:
+    """Return the program select of a pump."""
+    if not (data := device_coordinator.get_device_data()) or data.get(
+        "deviceType"
+    ) != "IF31":
+        return []
+    return [
+        PentairProgramSelectEntity(
+            coordinator=device_coordinator,
+            config_entry=config_entry,
+            description=PROGRAM_SELECT_DESCRIPTION,
+            device_id=data["deviceId"],
+        )
+    ]
+
+
+class PentairProgramSelectEntity(PentairEntity, SelectEntity):
+    """Program run by a pump, one option per program and off.
+
+    Replaces the per program lights: the state follows the device
+    coordinator and a selection is a single cloud request. The selected
+    option is kept until the pump reports a new snapshot, since the refresh
+    following the selection is usually skipped as unchanged.
+    """
+
+    _optimistic_option: str | None = None
+    _optimistic_delivered: Any = None
+
+    def _get_programs(self) -> tuple[dict[str, int], int | None]:
+        """Return the options of the programs and the running program."""
+        fields = (self.get_device() or {}).get("fields", {})
+        options = {
+            f"P{program_id} / {name}": program_id
+            for program_id, name in parse_programs(fields).items()
+        }
+        running = parse_running_program(fields)
+        return options, running if running in options.values() else None
+
+    def _get_delivered(self) -> Any:
+        """Return the report time of the device snapshot."""
+        return (self.get_device() or {}).get("delivered")
+
+    @property
+    def options(self) -> list[str]:
+        """Return the selectable programs."""
+        return [PROGRAM_OFF, *self.get_cached_value(self._get_programs)[0]]
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the running program."""
+        if self._optimistic_option is not None:
+            if self._get_delivered() == self._optimistic_delivered:
+                return self._optimistic_option
+            self._optimistic_option = None
+        options, running = self.get_cached_value(self._get_programs)
+        return next(
+            (option for option, program_id in options.items() if program_id == running),
+            PROGRAM_OFF,
+        )
+
+    async def async_select_option(self, option: str) -> None:
+        """Run the selected program, stopping the running one."""
+        options = self.get_cached_value(self._get_programs)[0]
+        # The running program, or the one selected the pump did not report yet
+        running = options.get(self.current_option)
+        if option != PROGRAM_OFF and option not in options:
+            raise HomeAssistantError(f"Unknown Pentair program {option}")
+        hub = self.hass.data[DOMAIN][self._config_entry.entry_id].get(
+            "pentair_cloud_hub"
+        )
+        if hub is None:
+            raise HomeAssistantError("Pentair Cloud is not connected")
+        _LOGGER.debug("Pentair Cloud Pump %s select %s", self._device_id, option)
+        executor = self.coordinator.executor
+        try:
+            await executor.async_run(hub.populate_AWS_token)
+            if (credentials := hub.credentials) is None:
+                raise HomeAssistantError("No Pentair Cloud credentials")
+            await executor.async_run(
+                hub.select_program,
+                credentials,
+                self._device_id,
+                options.get(option),
+                running,
+            )
+        except HomeAssistantError:
+            raise
+        except Exception as err:
+            raise HomeAssistantError(
+                f"Could not select Pentair program {option}: {err}"
+            ) from err
+        self._optimistic_option = option
+        self._optimistic_delivered = self._get_delivered()
+        self.async_write_ha_state()
+        await self.coordinator.async_request_refresh()
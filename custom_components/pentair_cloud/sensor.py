@@ -5,6 +5,7 @@ from __future__ import annotations
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -18,19 +19,25 @@ from homeassistant.const import (
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
     EntityCategory,
+    UnitOfEnergy,
     UnitOfMass,
     UnitOfPower,
     UnitOfPressure,
     UnitOfVolumeFlowRate,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.util.dt import as_local
+from homeassistant.util.dt import as_local, now as dt_now
 
-from .const import DOMAIN
-from .coordinator import PentairDataUpdateCoordinator
+from .const import DOMAIN, SIGNAL_DEVICE_ADDED
+from .coordinator import (
+    PentairDataUpdateCoordinator,
+    PentairDeviceDataUpdateCoordinator,
+)
 from .entity import PentairEntity
 from .helpers import convert_timestamp, get_field_value
+from .history import HISTORY_WINDOWS
 
 UNIT_MAP = {"kg": UnitOfMass.KILOGRAMS}
 
@@ -40,6 +47,14 @@ class PentairSensorEntityDescription(SensorEntityDescription):
 
     value_fn: Callable[[dict], Any]
 
+
+@dataclass(frozen=True, kw_only=True)
+class PentairCoordinatorSensorEntityDescription(SensorEntityDescription):
+    """Pentair sensor entity description for values kept by the coordinator."""
+
+    value_fn: Callable[[PentairDeviceDataUpdateCoordinator], Any]
+    exists_fn: Callable[[PentairDeviceDataUpdateCoordinator], bool] = lambda _: True
+
 SENSOR_MAP: dict[str | None, tuple[PentairSensorEntityDescription, ...]] = {
     None: (
         PentairSensorEntityDescription(
@@ -135,6 +150,130 @@ SENSOR_MAP: dict[str | None, tuple[PentairSensorEntityDescription, ...]] = {
     ),
 }
 
+HISTORY_SENSOR_FIELDS: dict[str, tuple[str, SensorDeviceClass | None, str]] = {
+    "s17": ("pressure", SensorDeviceClass.PRESSURE, UnitOfPressure.PSI),
+    "s18": ("power", SensorDeviceClass.POWER, UnitOfPower.WATT),
+    "s19": ("motor_speed", None, PERCENTAGE),
+    "s26": (
+        "estimated_flow",
+        SensorDeviceClass.VOLUME_FLOW_RATE,
+        UnitOfVolumeFlowRate.GALLONS_PER_MINUTE,
+    ),
+}
+
+
+def _history_window_value(
+    coordinator: PentairDeviceDataUpdateCoordinator,
+    field: str,
+    duration: int,
+    statistic: str,
+) -> float | None:
+    """Return a rolling statistic of the coordinator telemetry history."""
+    if coordinator.history is None:
+        return None
+    return getattr(coordinator.history.windows[(field, duration)], statistic)
+
+
+HISTORY_SENSOR_DESCRIPTIONS: tuple[PentairCoordinatorSensorEntityDescription, ...] = tuple(
+    PentairCoordinatorSensorEntityDescription(
+        key=f"{key}_{statistic}_{duration // 3600}h",
+        translation_key=f"{key}_{statistic}",
+        translation_placeholders={"hours": str(duration // 3600)},
+        device_class=device_class,
+        native_unit_of_measurement=unit,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        suggested_display_precision=1,
+        value_fn=partial(
+            _history_window_value,
+            field=field,
+            duration=duration,
+            statistic=statistic,
+        ),
+        exists_fn=lambda coordinator: coordinator.history is not None,
+    )
+    for field, (key, device_class, unit) in HISTORY_SENSOR_FIELDS.items()
+    for duration in HISTORY_WINDOWS
+    for statistic in ("mean", "min", "max")
+)
+
+COORDINATOR_SENSOR_MAP: dict[
+    str, tuple[PentairCoordinatorSensorEntityDescription, ...]
+] = {
+    "IF31": (
+        PentairCoordinatorSensorEntityDescription(
+            key="energy",
+            device_class=SensorDeviceClass.ENERGY,
+            native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            suggested_display_precision=3,
+            value_fn=lambda coordinator: coordinator.energy_storage.get_accumulator(
+                coordinator.device_id
+            ).energy_kwh,
+            exists_fn=lambda coordinator: coordinator.energy_storage is not None,
+        ),
+        PentairCoordinatorSensorEntityDescription(
+            key="gallons_per_watt_hour",
+            native_unit_of_measurement="gal/Wh",
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=2,
+            translation_key="gallons_per_watt_hour",
+            value_fn=lambda coordinator: coordinator.analytics
+            and coordinator.analytics.gallons_per_watt_hour,
+            exists_fn=lambda coordinator: coordinator.history is not None,
+        ),
+        PentairCoordinatorSensorEntityDescription(
+            key="full_speed_power",
+            device_class=SensorDeviceClass.POWER,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+            native_unit_of_measurement=UnitOfPower.WATT,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=0,
+            translation_key="full_speed_power",
+            value_fn=lambda coordinator: coordinator.analytics
+            and coordinator.analytics.full_speed_power,
+            exists_fn=lambda coordinator: coordinator.history is not None,
+        ),
+        PentairCoordinatorSensorEntityDescription(
+            key="pressure_deviation",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=1,
+            translation_key="pressure_deviation",
+            value_fn=lambda coordinator: (
+                coordinator.analytics.pressure_deviation * 100
+                if coordinator.analytics
+                and coordinator.analytics.pressure_deviation is not None
+                else None
+            ),
+            exists_fn=lambda coordinator: coordinator.history is not None,
+        ),
+        PentairCoordinatorSensorEntityDescription(
+            key="scheduled_program",
+            icon="mdi:calendar-clock",
+            translation_key="scheduled_program",
+            value_fn=lambda coordinator: (
+                program.name
+                if (program := coordinator.schedule.program_at(dt_now()))
+                else "Idle"
+            ),
+            exists_fn=lambda coordinator: coordinator.schedule is not None,
+        ),
+        PentairCoordinatorSensorEntityDescription(
+            key="next_schedule_transition",
+            device_class=SensorDeviceClass.TIMESTAMP,
+            translation_key="next_schedule_transition",
+            value_fn=lambda coordinator: coordinator.schedule.next_transition(
+                dt_now()
+            ),
+            exists_fn=lambda coordinator: coordinator.schedule is not None,
+        ),
+        *HISTORY_SENSOR_DESCRIPTIONS,
+    ),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -144,46 +283,21 @@ async def async_setup_entry(
     """Set up Pentair sensors using config entry."""
     coordinator: PentairDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]["pypentair_coordinator"]  
 
-    entities: list[PentairSensorEntity] = []
+    @callback
+    def _async_add_device(device_coordinator: PentairDeviceDataUpdateCoordinator) -> None:
+        """Add the sensors of a device discovered after setup."""
+        if entities := _get_device_entities(device_coordinator, config_entry):
+            async_add_entities(entities)
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICE_ADDED.format(config_entry.entry_id), _async_add_device
+        )
+    )
+
+    entities: list[SensorEntity] = []
     for device_coordinator in coordinator.device_coordinators:
-        if data := device_coordinator.get_device_data():
-            entities.append(
-                PentairSensorEntity(
-                    coordinator=device_coordinator,
-                    config_entry=config_entry,
-                    description=PentairSensorEntityDescription(
-                        key="last_report",
-                        device_class=SensorDeviceClass.TIMESTAMP,
-                        entity_category=EntityCategory.DIAGNOSTIC,
-                        translation_key="last_report",
-                        value_fn=lambda data: convert_timestamp(data["delivered"]),
-                    ),
-                    device_id=data["deviceId"],
-                )
-            )
-            for field, field_data in data.get("fields", {}).items():
-                unit = UNIT_MAP.get(field_data["unit"])
-                entity_description = PentairSensorEntityDescription(
-                    key=field,
-                    name=field_data["name"].strip().capitalize(),
-                    entity_category=(
-                        None
-                        if field_data["category"] == "data"
-                        else EntityCategory.DIAGNOSTIC
-                    ),
-                    native_unit_of_measurement=unit,
-                    state_class=SensorStateClass.MEASUREMENT if unit else None,
-                    translation_key=field,
-                    value_fn=lambda data, field=field: get_field_value(field, data),
-                )
-                entities.append(
-                    PentairSensorEntity(
-                        coordinator=device_coordinator,
-                        config_entry=config_entry,
-                        description=entity_description,
-                        device_id=data["deviceId"],
-                    )
-                )
+        entities.extend(_get_device_entities(device_coordinator, config_entry))
 
     if not entities:
         return
@@ -191,6 +305,63 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
+def _get_device_entities(
+    device_coordinator: PentairDeviceDataUpdateCoordinator, config_entry: ConfigEntry
+) -> list[SensorEntity]:
+    """Return the sensors of a device."""
+    if not (data := device_coordinator.get_device_data()):
+        return []
+
+    entities: list[SensorEntity] = [
+        PentairSensorEntity(
+            coordinator=device_coordinator,
+            config_entry=config_entry,
+            description=PentairSensorEntityDescription(
+                key="last_report",
+                device_class=SensorDeviceClass.TIMESTAMP,
+                entity_category=EntityCategory.DIAGNOSTIC,
+                translation_key="last_report",
+                value_fn=lambda data: convert_timestamp(data["delivered"]),
+            ),
+            device_id=data["deviceId"],
+        )
+    ]
+    entities.extend(
+        PentairCoordinatorSensorEntity(
+            coordinator=device_coordinator,
+            config_entry=config_entry,
+            description=description,
+            device_id=data["deviceId"],
+        )
+        for description in COORDINATOR_SENSOR_MAP.get(data.get("deviceType"), ())
+        if description.exists_fn(device_coordinator)
+    )
+    for field, field_data in data.get("fields", {}).items():
+        unit = UNIT_MAP.get(field_data["unit"])
+        entity_description = PentairSensorEntityDescription(
+            key=field,
+            name=field_data["name"].strip().capitalize(),
+            entity_category=(
+                None
+                if field_data["category"] == "data"
+                else EntityCategory.DIAGNOSTIC
+            ),
+            native_unit_of_measurement=unit,
+            state_class=SensorStateClass.MEASUREMENT if unit else None,
+            translation_key=field,
+            value_fn=lambda data, field=field: get_field_value(field, data),
+        )
+        entities.append(
+            PentairSensorEntity(
+                coordinator=device_coordinator,
+                config_entry=config_entry,
+                description=entity_description,
+                device_id=data["deviceId"],
+            )
+        )
+    return entities
+
+
 class PentairSensorEntity(PentairEntity, SensorEntity):
     """Pentair sensor entity."""
 
@@ -199,4 +370,19 @@ class PentairSensorEntity(PentairEntity, SensorEntity):
     @property
     def native_value(self) -> str | int | datetime | None:
         """Return the value reported by the sensor."""
-        return self.entity_description.value_fn(self.get_device())
+        return self.get_cached_value(
+            lambda: self.entity_description.value_fn(self.get_device())
+        )
+
+
+class PentairCoordinatorSensorEntity(PentairEntity, SensorEntity):
+    """Pentair sensor entity for values kept by the coordinator."""
+
+    entity_description: PentairCoordinatorSensorEntityDescription
+
+    @property
+    def native_value(self) -> str | int | float | datetime | None:
+        """Return the value kept by the coordinator."""
+        return self.get_cached_value(
+            lambda: self.entity_description.value_fn(self.coordinator)
+        )
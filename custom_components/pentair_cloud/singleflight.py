@@ -0,0 +1,96 @@
+"""Single-flight deduplication of concurrent idempotent calls."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+import threading
+from typing import Any
+
+
+class _Flight:
+    """A call in flight, shared by its callers."""
+
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Share one call between the threads asking for it at the same time.
+
+    The first caller for a key runs the function, the callers arriving
+    while it runs wait for it and get its result (or its exception). Once
+    the call is done, the next caller starts a new one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self.shared_calls = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args), or wait for the call in flight for the same key."""
+        with self._lock:
+            if (flight := self._flights.get(key)) is not None:
+                self.shared_calls += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func(*args)
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+
+class AsyncSingleFlight:
+    """Share one awaitable between the tasks asking for it at the same time."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._flights: dict[Hashable, asyncio.Future[Any]] = {}
+        self.shared_calls = 0
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Await func(), or the call in flight for the same key."""
+        if (flight := self._flights.get(key)) is not None:
+            self.shared_calls += 1
+            return await asyncio.shield(flight)
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as err:
+            flight.set_exception(err)
+            # Retrieved here, only the waiters (if any) get it raised
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
@@ -0,0 +1,77 @@
+"""Bounded trace of the Pentair API calls."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+import time
+from typing import Any
+
+TRACE_CAPACITY = 200
+
+
+@dataclass(frozen=True, slots=True)
+class ApiTraceEvent:
+    """An API call."""
+
+    timestamp: float
+    endpoint: str
+    device_id: str | None
+    duration_ms: float
+    status: int | None
+    error: str | None
+
+
+class ApiTraceCall:
+    """Mutable outcome of a traced call."""
+
+    __slots__ = ("status",)
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.status: int | None = None
+
+
+class ApiTrace:
+    """Ring buffer of the most recent API calls.
+
+    Recording is an append to a bounded deque (thread safe, no formatting),
+    so the trace is always on and only rendered by the diagnostics.
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY) -> None:
+        """Initialize."""
+        self._events: deque[ApiTraceEvent] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        """Return the number of recorded calls."""
+        return len(self._events)
+
+    @contextmanager
+    def call(self, endpoint: str, device_id: str | None = None) -> Iterator[ApiTraceCall]:
+        """Time a call and record it, the caller may set the HTTP status."""
+        call = ApiTraceCall()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield call
+        except Exception as err:
+            error = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            self._events.append(
+                ApiTraceEvent(
+                    timestamp=time.time(),
+                    endpoint=endpoint,
+                    device_id=device_id,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 1),
+                    status=call.status,
+                    error=error,
+                )
+            )
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the recorded calls, oldest first."""
+        return [asdict(event) for event in list(self._events)]
@@ -0,0 +1,167 @@
+"""Opt-in watchdog of the integration callbacks running on the event loop."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+WATCHDOG_THRESHOLD_MS = 5  # callbacks running longer are reported
+WATCHDOG_CAPACITY = 50  # slow callbacks kept for the diagnostics
+STACK_SAMPLES = 5  # stack samples kept per slow callback
+STACK_DEPTH = 12
+
+
+@dataclass
+class SlowCallback:
+    """A callback that held the event loop longer than the threshold."""
+
+    name: str
+    timestamp: float
+    duration_ms: float = 0
+    stacks: list[list[str]] = field(default_factory=list)
+
+
+class PentairLoopWatchdog:
+    """Time the integration callbacks running on the event loop.
+
+    The wrapped callbacks are timed on every call. While one runs, a sampler
+    thread wakes up every half threshold and, once the callback runs past
+    the threshold, samples the stack of the event loop thread, so the report shows where
+    the time goes and not only which callback took it. Slow callbacks are
+    kept in a ring for the diagnostics and raise a repair issue.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        threshold_ms: float = WATCHDOG_THRESHOLD_MS,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.threshold = threshold_ms / 1000
+        self.slow_callbacks: deque[SlowCallback] = deque(maxlen=WATCHDOG_CAPACITY)
+        self.calls = 0
+        self._current: SlowCallback | None = None
+        self._current_start = 0.0
+        self._loop_thread_id: int | None = None
+        self._stop = threading.Event()
+        self._running = threading.Event()  # Set while a wrapped callback runs
+        self._sampler: threading.Thread | None = None
+        self._issue_created = False
+
+    @callback
+    def async_start(self) -> None:
+        """Start the stack sampler, must be called from the event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._sampler = threading.Thread(
+            target=self._sample, name=f"{DOMAIN}_watchdog", daemon=True
+        )
+        self._sampler.start()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the sampler and clear the repair issue."""
+        self._stop.set()
+        self._running.set()  # Wake the sampler up so it exits
+        ir.async_delete_issue(self.hass, DOMAIN, self._issue_id)
+
+    @property
+    def _issue_id(self) -> str:
+        return f"slow_callback_{self.entry_id}"
+
+    def wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return func timed by the watchdog, func must be a sync callback."""
+
+        @wraps(func)
+        def _timed(*args: Any, **kwargs: Any) -> Any:
+            if self._current is not None:  # Nested, timed by the outer call
+                return func(*args, **kwargs)
+            self.calls += 1
+            current = SlowCallback(name=name, timestamp=time.time())
+            self._current_start = time.perf_counter()
+            self._current = current
+            self._running.set()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - self._current_start
+                self._current = None
+                self._running.clear()
+                if duration > self.threshold:
+                    current.duration_ms = round(duration * 1000, 1)
+                    self._async_report(current)
+
+        return _timed
+
+    @callback
+    def _async_report(self, slow_callback: SlowCallback) -> None:
+        """Keep a slow callback and raise the repair issue."""
+        self.slow_callbacks.append(slow_callback)
+        _LOGGER.debug(
+            "Callback %s held the event loop for %s ms",
+            slow_callback.name,
+            slow_callback.duration_ms,
+        )
+        if self._issue_created:
+            return
+        self._issue_created = True
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            self._issue_id,
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key="slow_callback",
+            translation_placeholders={
+                "name": slow_callback.name,
+                "duration": str(slow_callback.duration_ms),
+            },
+        )
+
+    def _sample(self) -> None:
+        """Sample the event loop stack while a callback runs too long."""
+        interval = self.threshold / 2
+        while True:
+            self._running.wait()  # Idle until a wrapped callback runs
+            if self._stop.wait(interval):
+                return
+            current = self._current
+            if (
+                current is None
+                or len(current.stacks) >= STACK_SAMPLES
+                or time.perf_counter() - self._current_start < self.threshold
+            ):
+                continue
+            if (frame := sys._current_frames().get(self._loop_thread_id)) is None:  # noqa: SLF001
+                continue
+            stack = [
+                line.strip()
+                for line in traceback.format_stack(frame, limit=STACK_DEPTH)
+            ]
+            if self._current is current and stack not in current.stacks:
+                current.stacks.append(stack)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the report of the watchdog."""
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "calls": self.calls,
+            "slow_callbacks": [asdict(slow) for slow in list(self.slow_callbacks)],
+        }
@@ -0,0 +1 @@
+"""Tests of the Pentair Cloud integration."""
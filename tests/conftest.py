@@ -0,0 +1,23 @@
+"""Fixtures of the Pentair Cloud tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import types
+
+COMPONENT_DIR = Path(__file__).parents[1] / "custom_components" / "pentair_cloud"
+
+# The tested modules (codec, aws, history, schedule...) do not depend on Home
+# Assistant. Without it installed, the integration package is registered
+# without running its __init__, which sets up the integration.
+try:
+    import homeassistant  # noqa: F401
+except ImportError:
+    for name, path in (
+        ("custom_components", COMPONENT_DIR.parent),
+        ("custom_components.pentair_cloud", COMPONENT_DIR),
+    ):
+        package = types.ModuleType(name)
+        package.__path__ = [str(path)]
+        sys.modules.setdefault(name, package)
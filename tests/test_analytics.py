@@ -0,0 +1,100 @@
+"""Tests of the pump analytics."""
+
+from __future__ import annotations
+
+import timeit
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("numpy")
+
+from custom_components.pentair_cloud.analytics import (  # noqa: E402
+    CLOGGED_FILTER_THRESHOLD,
+    compute_pump_analytics,
+)
+from custom_components.pentair_cloud.history import HISTORY_CAPACITY, TelemetryHistory
+from custom_components.pentair_cloud.watchdog import WATCHDOG_THRESHOLD_MS
+
+INTERVAL = 30  # seconds between samples
+FULL_SPEED_POWER = 2000  # W
+FULL_SPEED_PRESSURE = 12  # psi
+FULL_SPEED_FLOW = 80  # gpm
+
+
+def _speed(index: int) -> float:
+    """Return the speed (%) of a sample, the pump is stopped every 10th one."""
+    return 0 if index % 10 == 0 else 40 + index % 61
+
+
+def _history(pressure_rise: float = 0) -> TelemetryHistory:
+    """Return a full history following the affinity laws.
+
+    The pressure of the most recent quarter of the samples is raised by
+    pressure_rise.
+    """
+    history = TelemetryHistory()
+    for index in range(HISTORY_CAPACITY):
+        fraction = _speed(index) / 100
+        rise = 1 + pressure_rise if index >= HISTORY_CAPACITY * 3 // 4 else 1
+        history.append(
+            index * INTERVAL,
+            {
+                "s17": FULL_SPEED_PRESSURE * fraction**2 * rise,
+                "s18": FULL_SPEED_POWER * fraction**3,
+                "s19": _speed(index),
+                "s26": FULL_SPEED_FLOW * fraction,
+            },
+        )
+    assert len(history) == HISTORY_CAPACITY
+    return history
+
+
+def test_known_answers() -> None:
+    """The fits recover the coefficients the history was built with."""
+    analytics = compute_pump_analytics(_history())
+    fractions = [_speed(index) / 100 for index in range(HISTORY_CAPACITY - 1)]
+    gallons = sum(FULL_SPEED_FLOW * f for f in fractions) * INTERVAL / 60
+    watt_hours = sum(FULL_SPEED_POWER * f**3 for f in fractions) * INTERVAL / 3600
+
+    assert analytics.samples == HISTORY_CAPACITY - HISTORY_CAPACITY // 10
+    assert analytics.gallons_per_watt_hour == pytest.approx(gallons / watt_hours)
+    assert analytics.full_speed_power == pytest.approx(FULL_SPEED_POWER)
+    assert analytics.pressure_deviation == pytest.approx(0, abs=1e-9)
+    assert not analytics.filter_clogged
+
+
+@pytest.mark.parametrize(
+    ("pressure_rise", "clogged"),
+    [(0.10, False), (CLOGGED_FILTER_THRESHOLD - 0.01, False), (0.20, True)],
+)
+def test_clogged_filter(pressure_rise: float, clogged: bool) -> None:
+    """A pressure rise above the threshold at the same speed flags the filter."""
+    analytics = compute_pump_analytics(_history(pressure_rise))
+    assert analytics.pressure_deviation == pytest.approx(pressure_rise)
+    assert analytics.filter_clogged is clogged
+
+
+def test_gaps_not_integrated() -> None:
+    """Intervals longer than the gap limit are left out of the gallons per Wh."""
+    history = TelemetryHistory()
+    history.append(0, {"s18": 1000, "s26": 60})
+    history.append(60, {"s18": 1000, "s26": 30})
+    history.append(2000, {"s18": 1000, "s26": 30})
+    # 60 gallons for 1000 W over a minute, the 1940 s gap is skipped
+    assert compute_pump_analytics(history).gallons_per_watt_hour == pytest.approx(
+        60 / (1000 / 60)
+    )
+    assert compute_pump_analytics(history, max_gap=3600).gallons_per_watt_hour == (
+        pytest.approx((60 + 30 * 1940 / 60) / (1000 * 2000 / 3600))
+    )
+
+
+def test_fast_enough_for_the_event_loop() -> None:
+    """The analytics of a full history run within the loop watchdog threshold."""
+    history = _history()
+    compute_pump_analytics(history)  # Import NumPy
+    best = min(
+        timeit.repeat(lambda: compute_pump_analytics(history), number=1, repeat=20)
+    )
+    assert best * 1000 < WATCHDOG_THRESHOLD_MS
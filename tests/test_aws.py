@@ -0,0 +1,220 @@
+"""Tests of the SigV4 signer and the Cognito Identity client."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import timeit
+
+import orjson
+import pytest
+import requests
+
+from custom_components.pentair_cloud.aws import (
+    CognitoIdentityClient,
+    CognitoIdentityError,
+    SigV4Auth,
+    get_signing_key,
+)
+
+# Credentials and time of the AWS SigV4 test suite, 2015-08-30T12:36:00Z
+ACCESS_KEY_ID = "AKIDEXAMPLE"
+SECRET_ACCESS_KEY = "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"
+SESSION_TOKEN = (
+    "AQoDYXdzEPT//////////wEXAMPLEtc764bNrC9SAPBSM22wDOk4x4HIZ8j4FZTwdQWLWsKWHGBuFqwAe"
+    "MicRXmxfpSPfIeoIYRqTflfKD8YUuwthAx7mSEI/qkPpKPi/kMcGdQrmGdeehM4IC1NtBmUpp2wUE8phU"
+    "ZampKsburEDy0KPkyQDYwT7WZ0wq5VSXDvp75YU9HFvlRd8Tx6q6fE8YQcHNVXAkiY9q6d+xo0rKwT38x"
+    "Vqr7ZD0u0iPPkUL64lIZbqBAz+scqKmlzm8FDrypNC9Yjc8fPOLn9FX9KSYvKTr4rvx3iSIlTJabIQwj2"
+    "ICCR/oLxBA=="
+)
+NOW = 1440938160
+
+
+def _signer(session_token: str | None = None) -> SigV4Auth:
+    return SigV4Auth(
+        ACCESS_KEY_ID, SECRET_ACCESS_KEY, "us-east-1", "service", session_token
+    )
+
+
+def test_signing_key() -> None:
+    """The key derivation matches the example of the AWS documentation."""
+    assert (
+        get_signing_key(SECRET_ACCESS_KEY, "20150830", "us-east-1", "iam").hex()
+        == "c4afb1cc5771d871763a393e44b703571b55cc28424d1a5e86da6ed3c154a4b9"
+    )
+
+
+@pytest.mark.parametrize(
+    ("url", "signature"),
+    [
+        # get-vanilla
+        (
+            "https://example.amazon.com/",
+            "7ab4567ae243ee168f6bf18206b2b40b61ce08277323168138fa113ed23c538e",
+        ),
+        # get-vanilla-query-order-key-case
+        (
+            "https://example.amazon.com/?Param2=value2&Param1=value1",
+            "ca0a842792a27475df455b2925aa79d50a98e27d1733a46b57c22810e6b1a7bc",
+        ),
+    ],
+)
+def test_sign(url: str, signature: str) -> None:
+    """The test suite requests are signed with the expected signature."""
+    headers = _signer().sign("GET", url, None, now=NOW)
+    assert headers == {
+        "x-amz-date": "20150830T123600Z",
+        "authorization": (
+            "AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/20150830/us-east-1/service/"
+            f"aws4_request, SignedHeaders=host;x-amz-date, Signature={signature}"
+        ),
+    }
+
+
+def test_sign_session_token() -> None:
+    """Temporary credentials sign their session token."""
+    headers = _signer(SESSION_TOKEN).sign(
+        "GET", "https://example.amazon.com/", None, now=NOW
+    )
+    assert headers["x-amz-security-token"] == SESSION_TOKEN
+    assert headers["authorization"].endswith(
+        "SignedHeaders=host;x-amz-date;x-amz-security-token, Signature="
+        "55e4b683d5d0a9bc4fb1f2bc2e8986b9baa2accbc824893d97f4505d2a454b11"
+    )
+
+
+def test_sign_body() -> None:
+    """The body is part of the signature, str and bytes alike."""
+    signer = _signer()
+    url = "https://example.amazon.com/device/"
+    signed = signer.sign("PUT", url, b'{"payload":{}}', now=NOW)
+    assert signer.sign("PUT", url, '{"payload":{}}', now=NOW) == signed
+    assert signer.sign("PUT", url, b"{}", now=NOW) != signed
+
+
+def test_signing_key_cached() -> None:
+    """The signing key is derived once per day."""
+    signer = _signer()
+    key = signer.get_signing_key("20150830")
+    assert signer.get_signing_key("20150830") is key
+    assert signer.get_signing_key("20150831") != key
+
+
+def test_reused_signer_faster() -> None:
+    """Reusing the signer and its key beats a new signer per request."""
+    url = "https://example.amazon.com/api/device/device-service/user/device/"
+    signer = _signer(SESSION_TOKEN)
+    reused = min(
+        timeit.repeat(lambda: signer.sign("GET", url, None, NOW), number=200, repeat=10)
+    )
+    per_request = min(
+        timeit.repeat(
+            lambda: _signer(SESSION_TOKEN).sign("GET", url, None, NOW),
+            number=200,
+            repeat=10,
+        )
+    )
+    assert reused < per_request
+
+
+class _CognitoIdentityStub(BaseHTTPRequestHandler):
+    """Local stand-in of the Cognito Identity endpoint."""
+
+    responses: dict[str, tuple[int, bytes]] = {}
+    requests: list[tuple[dict[str, str], dict]] = []
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append((dict(self.headers), orjson.loads(body)))
+        status, content = self.responses[self.headers["X-Amz-Target"]]
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        """Do not log the requests."""
+
+
+@pytest.fixture
+def cognito_identity() -> Iterator[CognitoIdentityClient]:
+    """Return a client of the local Cognito Identity stand-in."""
+    _CognitoIdentityStub.responses = {}
+    _CognitoIdentityStub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CognitoIdentityStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with requests.Session() as session:
+        client = CognitoIdentityClient(session, "us-west-2")
+        assert client.endpoint == "https://cognito-identity.us-west-2.amazonaws.com/"
+        client.endpoint = f"http://127.0.0.1:{server.server_port}/"
+        yield client
+    server.shutdown()
+    server.server_close()
+
+
+def test_cognito_identity(cognito_identity: CognitoIdentityClient) -> None:
+    """GetId and GetCredentialsForIdentity return the identity and credentials."""
+    logins = {"cognito-idp.us-west-2.amazonaws.com/pool": "id-token"}
+    credentials = {
+        "AccessKeyId": "ASIA",
+        "SecretKey": "secret",
+        "SessionToken": "token",
+        "Expiration": 1.7e9,
+    }
+    _CognitoIdentityStub.responses = {
+        "AWSCognitoIdentityService.GetId": (
+            200,
+            orjson.dumps({"IdentityId": "us-west-2:identity"}),
+        ),
+        "AWSCognitoIdentityService.GetCredentialsForIdentity": (
+            200,
+            orjson.dumps(
+                {"IdentityId": "us-west-2:identity", "Credentials": credentials}
+            ),
+        ),
+    }
+
+    identity_id = cognito_identity.get_id("us-west-2:pool", logins)
+    assert identity_id == "us-west-2:identity"
+    assert (
+        cognito_identity.get_credentials_for_identity(identity_id, logins)
+        == credentials
+    )
+    (get_id_headers, get_id_body), (_, get_credentials_body) = (
+        _CognitoIdentityStub.requests
+    )
+    assert get_id_headers["content-type"] == "application/x-amz-json-1.1"
+    assert "Authorization" not in get_id_headers
+    assert get_id_body == {"IdentityPoolId": "us-west-2:pool", "Logins": logins}
+    assert get_credentials_body == {"IdentityId": identity_id, "Logins": logins}
+
+
+def test_cognito_identity_error(cognito_identity: CognitoIdentityClient) -> None:
+    """A service error raises with its type and message."""
+    _CognitoIdentityStub.responses = {
+        "AWSCognitoIdentityService.GetId": (
+            400,
+            orjson.dumps(
+                {
+                    "__type": "NotAuthorizedException",
+                    "message": "Invalid login token.",
+                }
+            ),
+        ),
+    }
+    with pytest.raises(
+        CognitoIdentityError,
+        match="GetId failed: NotAuthorizedException Invalid login token.",
+    ):
+        cognito_identity.get_id("us-west-2:pool", {})
+
+
+def test_cognito_identity_not_json(cognito_identity: CognitoIdentityClient) -> None:
+    """A body that is not JSON raises with the HTTP status."""
+    _CognitoIdentityStub.responses = {
+        "AWSCognitoIdentityService.GetId": (502, b"<html>Bad Gateway</html>"),
+    }
+    with pytest.raises(CognitoIdentityError, match="GetId returned HTTP 502"):
+        cognito_identity.get_id("us-west-2:pool", {})
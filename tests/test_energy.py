@@ -0,0 +1,39 @@
+"""Tests of the pump energy accumulator."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.pentair_cloud.energy import (  # noqa: E402
+    MAX_INTEGRATION_GAP,
+    PentairEnergyAccumulator,
+    get_max_integration_gap,
+)
+
+
+def test_gap_follows_poll_interval() -> None:
+    """The gap limit never drops below the backoff and grows with the interval."""
+    assert get_max_integration_gap(30) == MAX_INTEGRATION_GAP
+    assert get_max_integration_gap(600) == 1800
+    assert get_max_integration_gap(86400) == 259_200
+
+
+@pytest.mark.parametrize("poll_interval", [30, 900, 3600, 86400])
+def test_long_intervals_integrated(poll_interval: int) -> None:
+    """Samples one poll interval apart are integrated whatever the interval."""
+    accumulator = PentairEnergyAccumulator()
+    max_gap = get_max_integration_gap(poll_interval)
+    for index in range(3):
+        accumulator.add_sample(index * poll_interval, 1000, max_gap)
+    assert accumulator.energy_wh == pytest.approx(2 * poll_interval * 1000 / 3600)
+
+
+def test_outage_not_integrated() -> None:
+    """A gap longer than the limit restarts the integration."""
+    accumulator = PentairEnergyAccumulator()
+    assert not accumulator.add_sample(0, 1000, 900)
+    assert not accumulator.add_sample(901, 1000, 900)
+    assert accumulator.add_sample(1801, 1000, 900)
+    assert accumulator.energy_wh == pytest.approx(250)
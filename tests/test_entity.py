@@ -0,0 +1,66 @@
+"""Tests of the Pentair entity value cache."""
+
+from __future__ import annotations
+
+import timeit
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.pentair_cloud.sensor import (  # noqa: E402
+    PentairSensorEntity,
+    PentairSensorEntityDescription,
+)
+
+DEVICE = {
+    "deviceId": "pump",
+    "pname": "IntelliFlo",
+    "productInfo": {"nickName": "Pool pump"},
+    "fields": {"s18": {"value": "1200"}},
+}
+READS = 1000
+
+
+class _Coordinator:
+    """Device coordinator holding a snapshot and its generation."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.last_update_success = True
+
+    def get_device_data(self) -> dict[str, Any]:
+        return DEVICE
+
+
+def test_native_value_computed_once_per_generation() -> None:
+    """Repeated reads cost a cache lookup, a new generation recomputes once."""
+    computed = 0
+
+    def _value(data: dict[str, Any]) -> int:
+        nonlocal computed
+        computed += 1
+        # Stands for the field lookup and conversion of a real sensor
+        return sum(int(data["fields"]["s18"]["value"]) for _ in range(200))
+
+    coordinator = _Coordinator()
+    entity = PentairSensorEntity(
+        coordinator=coordinator,
+        config_entry=None,
+        description=PentairSensorEntityDescription(key="power", value_fn=_value),
+        device_id="pump",
+    )
+
+    assert entity.native_value == 240_000
+    cached_reads = timeit.timeit(lambda: entity.native_value, number=READS)
+    assert computed == 1
+
+    coordinator.generation += 1
+    bumped_reads = timeit.timeit(lambda: entity.native_value, number=READS)
+    assert computed == 2
+
+    uncached_reads = timeit.timeit(lambda: _value(DEVICE), number=READS)
+    # 0.24 us per cached read against 39 us uncached here
+    assert cached_reads < uncached_reads
+    assert bumped_reads < uncached_reads
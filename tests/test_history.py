@@ -0,0 +1,74 @@
+"""Tests of the pump telemetry history."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.pentair_cloud.history import (
+    HISTORY_CAPACITY,
+    HISTORY_FIELDS,
+    TelemetryHistory,
+)
+
+
+def test_memory_bound() -> None:
+    """The sample storage is fixed by the capacity."""
+    assert TelemetryHistory().memory_bytes == (
+        (len(HISTORY_FIELDS) + 1) * HISTORY_CAPACITY * 8
+    ) == 115_200
+    assert TelemetryHistory(("s18",), (60,), capacity=10).memory_bytes == 160
+
+
+def test_bounded_after_wrap() -> None:
+    """Appending past the capacity keeps the storage and the deques bounded."""
+    history = TelemetryHistory(("s18",), (3600,), capacity=50)
+    memory_bytes = history.memory_bytes
+    # Increasing then decreasing values fill the max then the min deque
+    for index in range(500):
+        history.append(index * 30, {"s18": index if index < 250 else 500 - index})
+    assert len(history) == 50
+    assert history.memory_bytes == memory_bytes
+    window = history.windows[("s18", 3600)]
+    assert len(window._min) <= 50  # noqa: SLF001
+    assert len(window._max) <= 50  # noqa: SLF001
+    assert list(history.ordered()) == [index * 30.0 for index in range(450, 500)]
+
+
+def test_stale_sample_ignored() -> None:
+    """Samples that are not newer than the last one are ignored."""
+    history = TelemetryHistory(("s18",), (3600,), capacity=10)
+    assert history.append(60, {"s18": 1})
+    assert not history.append(60, {"s18": 2})
+    assert not history.append(30, {"s18": 3})
+    assert len(history) == 1
+
+
+@pytest.mark.parametrize("capacity", [7, 64, 500])
+def test_rolling_windows(capacity: int) -> None:
+    """Mean, min and max match a brute force over the window samples."""
+    rng = random.Random(capacity)
+    durations = (300, 3600)
+    history = TelemetryHistory(("s18",), durations, capacity=capacity)
+    samples: list[tuple[float, float | None]] = []
+    timestamp = 0.0
+    for _ in range(3 * capacity + 100):
+        timestamp += rng.choice((15, 30, 30, 30, 600))  # Some missed polls
+        value = None if rng.random() < 0.1 else rng.uniform(0, 3000)
+        history.append(timestamp, {"s18": value})
+        samples.append((timestamp, value))
+
+        for duration in durations:
+            expected = [
+                value
+                for sample_timestamp, value in samples[-capacity:]
+                if sample_timestamp >= timestamp - duration and value is not None
+            ]
+            window = history.windows[("s18", duration)]
+            if not expected:
+                assert (window.mean, window.min, window.max) == (None, None, None)
+                continue
+            assert window.mean == pytest.approx(sum(expected) / len(expected))
+            assert window.min == min(expected)
+            assert window.max == max(expected)
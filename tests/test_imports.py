@@ -0,0 +1,46 @@
+"""Tests of the lazy imports of the cloud hub."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from .conftest import COMPONENT_DIR
+
+HEAVY_MODULES = ("boto3", "botocore", "numpy", "pycognito", "requests")
+# Importing the hub took 65 ms and 10 MB here, pycognito alone 211 ms and
+# 35 MB, boto3 146 ms and 21 MB, NumPy 58 ms and 14 MB
+IMPORT_TIME_BUDGET_MS = 200
+IMPORT_RSS_BUDGET_MB = 20
+
+# Imports the hub, reports the import time, the resident memory it added
+# and the heavy modules it loaded
+IMPORT_SCRIPT = f"""
+import os, sys, time, types
+def rss():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+package = types.ModuleType("pentair_cloud")
+package.__path__ = [{str(COMPONENT_DIR)!r}]
+sys.modules["pentair_cloud"] = package
+start_rss = rss()
+start = time.perf_counter()
+import pentair_cloud.pentaircloud
+print((time.perf_counter() - start) * 1000)
+print(rss() - start_rss)
+print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def test_hub_import_is_light() -> None:
+    """Importing the hub stays within budget and loads no heavy library."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.splitlines()
+    import_ms, rss_mb, loaded = float(output[0]), float(output[1]), output[2]
+    assert loaded == ""
+    assert import_ms < IMPORT_TIME_BUDGET_MS
+    assert rss_mb < IMPORT_RSS_BUDGET_MB
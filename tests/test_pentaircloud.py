@@ -0,0 +1,104 @@
+"""Tests of the cloud hub authentication."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import pytest
+
+from custom_components.pentair_cloud.pentaircloud import PentairCloudHub
+
+TOKENS = {
+    "access_token": "access",
+    "id_token": "id",
+    "refresh_token": "refresh",
+}
+
+
+class _CognitoClient:
+    """Stand-in of the Cognito user pool client, recording its calls."""
+
+    def __init__(self, pool: _CognitoPool, **tokens: str | None) -> None:
+        self.pool = pool
+        self.access_token = tokens.get("access_token")
+
+    def _renew(self, call: str) -> None:
+        self.pool.calls.append(call)
+        if self.pool.fail_resume:
+            raise ValueError("refresh token revoked")
+
+    def check_token(self) -> None:
+        self._renew("check_token")
+
+    def renew_access_token(self) -> None:
+        self._renew("renew_access_token")
+
+    def authenticate(self, password: str) -> None:
+        self.pool.calls.append("authenticate")
+
+    def get_user(self) -> None:
+        self.pool.calls.append("get_user")
+
+
+class _CognitoPool:
+    """The clients the hub created and the calls they received."""
+
+    def __init__(self) -> None:
+        self.fail_resume = False
+        self.clients: list[_CognitoClient] = []
+        self.calls: list[str] = []
+
+    def get_cognito_client(self, usr: str, **tokens: str | None) -> _CognitoClient:
+        client = _CognitoClient(self, **tokens)
+        self.clients.append(client)
+        return client
+
+
+@pytest.fixture
+def pool(monkeypatch: pytest.MonkeyPatch) -> _CognitoPool:
+    """Return the Cognito user pool the hub logs in to."""
+    pool = _CognitoPool()
+    monkeypatch.setattr(
+        PentairCloudHub,
+        "get_cognito_client",
+        lambda hub, usr, **tokens: pool.get_cognito_client(usr, **tokens),
+    )
+    return pool
+
+
+@pytest.mark.parametrize(
+    ("tokens", "renewal"),
+    [
+        (TOKENS, "check_token"),
+        (TOKENS | {"access_token": None}, "renew_access_token"),
+    ],
+)
+def test_resume_skips_login(
+    pool: _CognitoPool, tokens: dict[str, Any], renewal: str
+) -> None:
+    """Persisted tokens resume the session without an SRP login."""
+    hub = PentairCloudHub(logging.getLogger(__name__), session=object())
+    assert hub.resume("user@example.com", "password", tokens)
+    assert pool.calls == [renewal]
+    assert hub.auth_method == "tokens"
+    assert hub.cognito_client is pool.clients[0]
+    assert hub.auth_duration_ms is not None
+
+
+def test_resume_falls_back_to_login(pool: _CognitoPool) -> None:
+    """Tokens that cannot be renewed fall back to the SRP login."""
+    pool.fail_resume = True
+    hub = PentairCloudHub(logging.getLogger(__name__), session=object())
+    assert hub.resume("user@example.com", "password", TOKENS)
+    assert pool.calls == ["check_token", "authenticate", "get_user"]
+    assert hub.auth_method == "srp"
+    assert hub.cognito_client is pool.clients[1]
+
+
+def test_resume_without_tokens(pool: _CognitoPool) -> None:
+    """Without a refresh token the SRP login runs directly."""
+    hub = PentairCloudHub(logging.getLogger(__name__), session=object())
+    assert hub.resume("user@example.com", "password", {})
+    assert pool.calls == ["authenticate", "get_user"]
+    assert hub.auth_method == "srp"
@@ -0,0 +1,126 @@
+"""Tests of the weekly schedule index."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from custom_components.pentair_cloud.schedule import PentairScheduleIndex
+
+MONDAY = 0b0000001
+TUESDAY = 0b0000010
+SUNDAY = 0b1000000
+EVERY_DAY = 0b1111111
+
+
+def _program_fields(
+    program_id: int,
+    start: int,
+    duration: int,
+    days: int,
+    enabled: bool = True,
+    program_type: int = 0,
+) -> dict[str, Any]:
+    """Return the payload fields of a program, as the cloud reports them."""
+    prefix = f"zp{program_id}"
+    return {
+        f"{prefix}e2": {"value": f"Program {program_id}"},
+        f"{prefix}e5": {"value": str(program_type)},
+        f"{prefix}e6": {"value": str(start)},
+        f"{prefix}e7": {"value": str(duration)},
+        f"{prefix}e8": {"value": str(days)},
+        f"{prefix}e10": {"value": "1" if enabled else "0"},
+        f"{prefix}e13": {"value": "1"},
+    }
+
+
+def _index(*programs: dict[str, Any]) -> PentairScheduleIndex:
+    index = PentairScheduleIndex()
+    assert index.update(
+        {key: value for fields in programs for key, value in fields.items()}
+    )
+    return index
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    """Return a time of the week of Monday 2024-01-01."""
+    return datetime(2024, 1, 1 + day, hour, minute)
+
+
+def _program_id(index: PentairScheduleIndex, when: datetime) -> int | None:
+    return program.id if (program := index.program_at(when)) else None
+
+
+def test_wraps_past_midnight() -> None:
+    """A program running past midnight runs into the next day."""
+    index = _index(_program_fields(1, 23 * 60, 120, MONDAY))
+    assert _program_id(index, _at(0, 22, 59)) is None
+    assert _program_id(index, _at(0, 23, 30)) == 1
+    assert _program_id(index, _at(1, 0, 59)) == 1
+    assert _program_id(index, _at(1, 1)) is None
+    assert index.next_transition(_at(0, 12)) == _at(0, 23)
+    assert index.next_transition(_at(0, 23, 30)) == _at(1, 1)
+
+
+def test_wraps_sunday_to_monday() -> None:
+    """A Sunday program running past midnight ends on Monday morning."""
+    index = _index(_program_fields(1, 22 * 60, 180, SUNDAY))
+    assert _program_id(index, _at(6, 23)) == 1
+    assert _program_id(index, _at(0, 0, 30)) == 1
+    assert _program_id(index, _at(0, 1)) is None
+    assert index.next_transition(_at(6, 23)) == _at(7, 1)
+    # From Monday after the end, the next start is on Sunday
+    assert index.next_transition(_at(0, 2)) == _at(6, 22)
+
+
+def test_every_day_around_the_week_start() -> None:
+    """The week start is not a transition of a program running through it."""
+    index = _index(_program_fields(1, 23 * 60, 120, EVERY_DAY))
+    assert index.next_transition(_at(6, 23, 30)) == _at(7, 1)
+    assert index.next_transition(_at(6, 12)) == _at(6, 23)
+
+
+def test_overlapping_programs() -> None:
+    """The program that started last runs while programs overlap."""
+    index = _index(
+        _program_fields(1, 8 * 60, 240, MONDAY),
+        _program_fields(2, 10 * 60, 60, MONDAY),
+    )
+    assert _program_id(index, _at(0, 9)) == 1
+    assert _program_id(index, _at(0, 10, 30)) == 2
+    assert _program_id(index, _at(0, 11, 30)) == 1
+    assert _program_id(index, _at(0, 12)) is None
+    assert index.next_transition(_at(0, 9)) == _at(0, 10)
+    assert index.next_transition(_at(0, 10, 30)) == _at(0, 11)
+    assert index.next_transition(_at(0, 11, 30)) == _at(0, 12)
+
+
+def test_disabled_and_other_programs_ignored() -> None:
+    """Disabled, non schedule and dayless programs are not scheduled."""
+    index = _index(
+        _program_fields(1, 8 * 60, 60, MONDAY, enabled=False),
+        _program_fields(2, 9 * 60, 60, MONDAY, program_type=2),
+        _program_fields(3, 10 * 60, 60, 0),
+        _program_fields(4, 11 * 60, 60, TUESDAY),
+    )
+    assert [program.id for program in index.programs] == [4]
+    assert _program_id(index, _at(0, 8, 30)) is None
+    assert index.next_transition(_at(0, 8)) == _at(1, 11)
+
+
+def test_no_program() -> None:
+    """Without a scheduled program nothing runs and nothing changes."""
+    index = _index(_program_fields(1, 8 * 60, 60, MONDAY, enabled=False))
+    assert index.program_at(_at(0, 8, 30)) is None
+    assert index.next_transition(_at(0, 8)) is None
+
+
+def test_rebuilt_only_when_programs_change() -> None:
+    """Other fields and unchanged programs keep the index."""
+    fields = _program_fields(1, 8 * 60, 60, MONDAY)
+    index = PentairScheduleIndex()
+    assert index.update(fields)
+    assert not index.update(fields | {"s18": {"value": "1200"}})
+    assert not index.update({key: dict(value) for key, value in fields.items()})
+    assert index.update(fields | {"zp1e6": {"value": str(9 * 60)}})
+    assert index.next_transition(_at(0, 0)) == _at(0, 9)